@@ -3,17 +3,20 @@
 # by performing tokenization, lemmatization, POS tagging, and dependency parsing using spaCy.
 # It filters stopwords and low-frequency lemmas for downstream tasks.
 
-import spacy
 import json
 from collections import Counter
 from nltk.corpus import stopwords
 import os
 import nltk
 
+from model_server import count_lemmas, load_nlp
+from parse_service import load_section_docs
+from token_store import TokenStoreWriter
+
 nltk.download('stopwords')
 
 # Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+nlp = load_nlp()
 
 # Custom stopwords (Faulkner-specific additions)
 custom_stopwords = {"'em", "'bout"}
@@ -27,50 +30,77 @@ os.makedirs(output_dir, exist_ok=True)
 lemma_counter = Counter()
 
 
-# First pass: collect lemma frequency from all documents
-def collect_lemmas():
-    for file in os.listdir(input_dir):
-        if file.endswith(".xml"):
-            with open(os.path.join(input_dir, file), encoding="utf-8") as f:
-                text = f.read()
-                text_content = ' '.join([line.strip() for line in text.splitlines() if '<p>' in line])
-                doc = nlp(text_content)
-                lemma_counter.update([token.lemma_ for token in doc if token.is_alpha])
+# Single pass: parse each section once and keep a compact record per token
+def parse_sections(section_docs):
+    parsed = {}
+    for section, doc in section_docs.items():
+        sentences = []
+        records = []  # (text, lemma, pos, tag, dep, head offset, is_alpha, sentence_id)
+        for i, sent in enumerate(doc.sents):
+            sentences.append(sent.text)
+            records.extend((token.text, token.lemma_, token.pos_, token.tag_, token.dep_,
+                            token.head.i - token.i, token.is_alpha, i) for token in sent)
+        parsed[section] = (sentences, records)
+    return parsed
+
+
+# Collect lemma frequency from all documents (count_lemmas, as behind the model server's
+# /lemma_counts, applied to the Docs that were already parsed)
+def collect_lemmas(section_docs):
+    for counts in count_lemmas(section_docs.values()):
+        lemma_counter.update(counts)
 
 
-# Second pass: preprocess and export
-def preprocess_documents():
-    for file in os.listdir(input_dir):
-        if file.endswith(".xml"):
-            section = file.replace(".xml", "")
-            with open(os.path.join(input_dir, file), encoding="utf-8") as f:
-                text = f.read()
-                text_content = ' '.join([line.strip() for line in text.splitlines() if '<p>' in line])
-                doc = nlp(text_content)
-                output = []
-                for i, sent in enumerate(doc.sents):
-                    tokens, lemmas, pos = [], [], []
-                    for token in sent:
-                        if token.is_alpha and token.lemma_ not in stop_words and lemma_counter[token.lemma_] >= 3:
-                            tokens.append(token.text)
-                            lemmas.append(token.lemma_)
-                            pos.append(token.pos_)
-                    if tokens:
-                        output.append({
-                            "section": section,
-                            "sentence_id": i,
-                            "sentence": sent.text,
-                            "tokens": tokens,
-                            "lemmas": lemmas,
-                            "pos": pos
-                        })
-                out_path = os.path.join(output_dir, f"{section}.jsonl")
-                with open(out_path, "w", encoding="utf-8") as out:
-                    for entry in output:
-                        out.write(json.dumps(entry) + "\n")
-                print(f"Processed: {section} → {out_path}")
+# Filter the stored records and export (JSONL per section plus the columnar token store)
+def preprocess_documents(parsed):
+    store = TokenStoreWriter(os.path.join(output_dir, "tokens"))
+    for section, (sentences, records) in parsed.items():
+        output = []
+        by_sentence = {}
+        for record in records:
+            by_sentence.setdefault(record[7], []).append(record)
+        for i, sent_records in by_sentence.items():
+            keep = [is_alpha and lemma not in stop_words and lemma_counter[lemma] >= 3
+                    for _, lemma, _, _, _, _, is_alpha, _ in sent_records]
+            kept = [record[:3] for record, flag in zip(sent_records, keep) if flag]
+            if kept:
+                store.add_sentence(section, i, sentences[i], {
+                    "word": [record[0] for record in sent_records],
+                    "lemma": [record[1] for record in sent_records],
+                    "pos": [record[2] for record in sent_records],
+                    "tag": [record[3] for record in sent_records],
+                    "dep": [record[4] for record in sent_records],
+                    "head": [record[5] for record in sent_records],
+                    "is_alpha": [record[6] for record in sent_records],
+                    "keep": keep
+                })
+                output.append({
+                    "section": section,
+                    "sentence_id": i,
+                    "sentence": sentences[i],
+                    "tokens": [text for text, _, _ in kept],
+                    "lemmas": [lemma for _, lemma, _ in kept],
+                    "pos": [pos for _, _, pos in kept],
+                    # Unfiltered tokens with their syntactic annotations (heads are offsets from the token)
+                    "words": [record[0] for record in sent_records],
+                    "word_pos": [record[2] for record in sent_records],
+                    "tags": [record[3] for record in sent_records],
+                    "deps": [record[4] for record in sent_records],
+                    "heads": [record[5] for record in sent_records],
+                    "is_alpha": [record[6] for record in sent_records]
+                })
+        out_path = os.path.join(output_dir, f"{section}.jsonl")
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)  # manifest works get one folder each
+        with open(out_path, "w", encoding="utf-8") as out:
+            for entry in output:
+                out.write(json.dumps(entry) + "\n")
+        print(f"Processed: {section} → {out_path}")
+    store.close()
+    print(f"Token store: {store.path}")
 
 
 if __name__ == "__main__":
-    collect_lemmas()
-    preprocess_documents()
+    section_docs = load_section_docs(nlp, input_dir)
+    parsed_sections = parse_sections(section_docs)
+    collect_lemmas(section_docs)
+    preprocess_documents(parsed_sections)
@@ -0,0 +1,101 @@
+# anova_engine.py
+# One-way ANOVA and Tukey HSD for every metric column at once.
+# Group counts, means and variances of all metrics come from a single groupby pass; F statistics
+# and Tukey's studentized ranges are then computed on those group x metric arrays, so no model is
+# fitted per metric. Results match scipy's f_oneway and statsmodels' pairwise_tukeyhsd (metrics
+# are compared on their non-missing values) and are returned as one tidy table, with p-values also
+# corrected for multiple comparisons across metrics.
+
+import numpy as np
+import pandas as pd
+from scipy.stats import f, studentized_range
+from statsmodels.stats.multitest import multipletests
+
+RESULTS_PATH = "anova_tukey_results.csv"
+ALPHA = 0.05
+CORRECTION = "fdr_bh"  # any statsmodels multipletests method
+RESULT_COLUMNS = ["metric", "test", "group1", "group2", "statistic", "df1", "df2", "p_value", "p_corrected",
+                  "lower", "upper", "reject", "reject_corrected", "constant_group"]
+
+
+def group_moments(df, metrics, group_col="section"):
+    # groups x metrics tables of non-missing counts, means, variances and distinct values
+    grouped = df.groupby(group_col)[metrics]
+    return grouped.count(), grouped.mean(), grouped.var(ddof=1).fillna(0.0), grouped.nunique()
+
+
+def anova_arrays(counts, means, variances):
+    """F, p, between- and within-group degrees of freedom and the within-group mean square per metric."""
+    n = counts.to_numpy(dtype=float)
+    mean = np.nan_to_num(means.to_numpy(dtype=float))
+    total = n.sum(axis=0)
+    k = (n > 0).sum(axis=0)
+    grand = (n * mean).sum(axis=0) / total
+    ss_between = (n * (mean - grand) ** 2).sum(axis=0)
+    ss_within = (np.maximum(n - 1, 0) * variances.to_numpy(dtype=float)).sum(axis=0)
+    df_between, df_within = k - 1, total - k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ms_within = ss_within / df_within
+        f_stat = (ss_between / df_between) / ms_within
+    return f_stat, f.sf(f_stat, df_between, df_within), df_between, df_within, ms_within
+
+
+def tukey_rows(metric, groups, n, mean, ms_within, df_within, alpha):
+    # All pairs of the groups that have observations, in pairwise_tukeyhsd's order and sign
+    present = n > 0
+    groups, n, mean = groups[present], n[present], mean[present]
+    k = len(groups)
+    if k < 2 or not df_within > 0:
+        return []
+    i, j = np.triu_indices(k, 1)
+    meandiff = mean[j] - mean[i]
+    std_pairs = np.sqrt(ms_within / 2.0 * (1.0 / n[i] + 1.0 / n[j]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        st_range = np.abs(meandiff) / std_pairs
+    q_crit = studentized_range.ppf(1 - alpha, k, df_within)
+    p_values = studentized_range.sf(st_range, k, df_within)
+    return [{"metric": metric, "test": "Tukey", "group1": groups[a], "group2": groups[b], "statistic": meandiff[x],
+             "df1": k, "df2": df_within, "p_value": p_values[x],
+             "lower": meandiff[x] - q_crit * std_pairs[x], "upper": meandiff[x] + q_crit * std_pairs[x],
+             "reject": bool(st_range[x] > q_crit)}
+            for x, (a, b) in enumerate(zip(i, j))]
+
+
+def anova_tukey_table(df, metrics, group_col="section", alpha=ALPHA, correction=CORRECTION):
+    """
+    Tidy table with one ANOVA row per metric (statistic = F) and one Tukey row per pair of groups
+    per metric (statistic = mean of group2 - mean of group1, lower/upper = simultaneous interval).
+    p_corrected adjusts the ANOVA p-values across metrics, and the Tukey p-values across all pairs
+    of all metrics. df1/df2 are the F degrees of freedom for ANOVA rows, and the number of groups and
+    the error degrees of freedom of the studentized range for Tukey rows.
+    constant_group marks metrics with a group whose values are all identical.
+    """
+    counts, means, variances, distinct = group_moments(df, metrics, group_col)
+    f_stat, p_values, df_between, df_within, ms_within = anova_arrays(counts, means, variances)
+    constant = (distinct[counts > 0] == 1).any(axis=0).to_numpy()
+    groups = counts.index.to_numpy()
+
+    anova = []
+    tukey = []
+    for x, metric in enumerate(metrics):
+        anova.append({"metric": metric, "test": "ANOVA", "group1": "-", "group2": "-", "statistic": f_stat[x],
+                      "df1": df_between[x], "df2": df_within[x], "p_value": p_values[x],
+                      "reject": bool(p_values[x] < alpha)})
+        tukey.extend(tukey_rows(metric, groups, counts[metric].to_numpy(dtype=float),
+                                means[metric].to_numpy(dtype=float), ms_within[x], df_within[x], alpha))
+
+    for rows in (anova, tukey):
+        tested = [row for row in rows if not np.isnan(row["p_value"])]
+        if tested:
+            reject, corrected, _, _ = multipletests([row["p_value"] for row in tested], alpha=alpha, method=correction)
+            for row, p_corrected, rejected in zip(tested, corrected, reject):
+                row["p_corrected"] = p_corrected
+                row["reject_corrected"] = bool(rejected)
+
+    results = pd.DataFrame(anova + tukey, columns=RESULT_COLUMNS)
+    results["constant_group"] = results["metric"].map(dict(zip(metrics, constant)))
+    return results
+
+
+def format_p(p_value):
+    return "< 1e-10" if p_value == 0 else f"{p_value:.2e}"
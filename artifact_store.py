@@ -0,0 +1,119 @@
+# artifact_store.py
+# Content hashes and a manifest of generated artifacts (figures, tables, reports).
+# Each output is recorded with a key derived from everything it was built from (input data,
+# parameters, code) and the hash of the file that was written, so later runs can skip outputs
+# whose key is unchanged and whose file is still the one that was recorded.
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ARTIFACT_DIR = ".artifacts"
+MANIFEST_PATH = os.path.join(ARTIFACT_DIR, "manifest.json")
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def update_digest(digest, obj):
+    # Deterministic hashing of the data structures passed to figures and reports
+    if isinstance(obj, pd.DataFrame):
+        digest.update(json.dumps([list(map(str, obj.columns)), list(map(str, obj.dtypes))]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        update_digest(digest, obj.to_frame())
+    elif isinstance(obj, np.ndarray):
+        digest.update(f"{obj.dtype}{obj.shape}".encode("utf-8"))
+        digest.update(np.ascontiguousarray(obj).tobytes() if obj.dtype != object else repr(obj.tolist()).encode("utf-8"))
+    elif isinstance(obj, dict):
+        digest.update(b"{")
+        for key in sorted(obj, key=str):
+            digest.update(str(key).encode("utf-8"))
+            update_digest(digest, obj[key])
+        digest.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"[")
+        for item in obj:
+            update_digest(digest, item)
+        digest.update(b"]")
+    else:
+        digest.update(json.dumps(obj, default=str).encode("utf-8"))
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock across processes, held on path + ".lock" while the block runs."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def data_hash(*objs):
+    digest = hashlib.sha256()
+    for obj in objs:
+        update_digest(digest, obj)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Manifest of output path -> {key, hash, inputs}; only the parent process writes it."""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.entries = self.load()
+        self.updated = {}
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def is_current(self, output, key):
+        entry = self.entries.get(output)
+        return (entry is not None and entry["key"] == key and os.path.exists(output)
+                and file_hash(output) == entry["hash"])
+
+    def record(self, output, key, inputs=()):
+        self.entries[output] = self.updated[output] = {"key": key, "hash": file_hash(output), "inputs": list(inputs)}
+
+    def input_hashes(self, paths):
+        return {path: file_hash(path) for path in paths}
+
+    def save(self):
+        # Merge into the manifest on disk under a lock, so scripts saving side by side (parallel
+        # pipeline stages) keep each other's entries
+        with file_lock(self.path):
+            self.entries = {**self.load(), **self.updated}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
@@ -1,8 +1,12 @@
+import os
+
 import pandas as pd
-import scipy.stats as stats
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from anova_engine import RESULTS_PATH, anova_tukey_table
+from figure_renderer import Figure, render_figures
+
 # Load the sliding window style metrics data
 df = pd.read_csv("style_metrics_sliding_window_full.csv")
 
@@ -16,24 +20,28 @@ metrics = [
 print("Descriptive statistics by section:")
 print(df.groupby("section")[metrics].describe())
 
-# Perform one-way ANOVA for each metric across sections
+# One-way ANOVA for all metrics, as saved by significance_test.py (fitted here only when missing)
 print("\n--- ANOVA Results ---")
-for metric in metrics:
-    groups = [group[metric].dropna().values for name, group in df.groupby("section")]
-    try:
-        f_val, p_val = stats.f_oneway(*groups)
-        print(f"{metric}: F = {f_val:.3f}, p = {p_val:.4f}")
-    except Exception as e:
-        print(f"{metric}: ANOVA failed - {e}")
+if os.path.exists(RESULTS_PATH):
+    results = pd.read_csv(RESULTS_PATH)
+else:
+    results = anova_tukey_table(df, metrics)
+for _, row in results[results["test"] == "ANOVA"].iterrows():
+    print(f"{row['metric']}: F = {row['statistic']:.3f}, p = {row['p_value']:.4f} "
+          f"(corrected p = {row['p_corrected']:.4f})")
+
 
 # Visualization: Boxplots of each metric by section
-for metric in metrics:
-    plt.figure(figsize=(8, 5))
-    sns.boxplot(x="section", y=metric, data=df, palette="Set2")
+def plot_boxplot(data, metric):
+    fig = plt.figure(figsize=(8, 5))
+    sns.boxplot(x="section", y=metric, data=data, palette="Set2")
     plt.title(f"{metric} distribution by Section")
     plt.xlabel("Section")
     plt.ylabel(metric)
     plt.tight_layout()
-    plt.savefig(f"{metric}_by_section_boxplot.png")
-    plt.close()
-    print(f"Saved plot: {metric}_by_section_boxplot.png")
+    return fig
+
+
+# Rendered in parallel; unchanged plots are skipped
+render_figures([Figure(f"{metric}_by_section_boxplot.png", plot_boxplot, df[["section", metric]], {"metric": metric})
+                for metric in metrics])
@@ -0,0 +1,180 @@
+# change_detection.py
+# Outlier and change-point detection for the sliding-window metric tables.
+# Windows are compared only with windows of their own section (and sweep config): rolling z-scores
+# against the preceding windows and robust z-scores (median/MAD) are computed for every metric at
+# once from cumulative sums over the sorted table, and change points come from binary segmentation
+# with a normal mean-shift cost, splitting the open segments of every section and metric together
+# in one vectorized prefix-sum scan per level.
+# The result is one tidy table of flagged windows.
+
+import numpy as np
+import pandas as pd
+
+RESULTS_PATH = "change_points.csv"
+KEY_COLUMNS = ["config", "window_size", "step_size", "section", "window_start"]
+ROLLING_WINDOW = 20  # preceding windows in the rolling mean/std
+MIN_PERIODS = 5
+ROLLING_THRESHOLD = 3.0
+MAD_THRESHOLD = 3.5  # Iglewicz & Hoaglin's cut-off for modified z-scores
+PENALTY = 3.0  # times log(n); above BIC's 2 because overlapping windows are autocorrelated
+MIN_SEGMENT = None  # windows per segment; None: as many as overlap one window's text in each group
+RESULT_COLUMNS = ["metric", "method", "value", "score", "threshold"]
+
+
+def metric_columns(df):
+    return [column for column in df.columns
+            if column not in KEY_COLUMNS and pd.api.types.is_numeric_dtype(df[column])]
+
+
+def group_offsets(df, group_cols, order_col="window_start"):
+    """Table sorted by group and position, the first row index of each row's group and the group bounds."""
+    df = df.sort_values(group_cols + [order_col], kind="stable", ignore_index=True)
+    codes = df.groupby(group_cols, sort=False).ngroup().to_numpy()
+    new_group = np.ones(len(df), dtype=bool)
+    new_group[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(new_group)
+    first = starts[np.cumsum(new_group) - 1]
+    return df, first, starts, np.append(starts[1:], len(df))
+
+
+def robust_zscores(df, metrics, group_cols):
+    # 0.6745 (x - median) / MAD per group; NaN where the MAD is 0
+    grouped = df.groupby(group_cols, sort=False)[metrics]
+    deviations = df[metrics] - grouped.transform("median")
+    mad = deviations.abs().groupby([df[column] for column in group_cols], sort=False).transform("median")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = 0.6745 * deviations.to_numpy(dtype=float) / mad.to_numpy(dtype=float)
+    return np.where(np.isfinite(z), z, np.nan)
+
+
+def prefix_sums(values):
+    # Cumulative sums, sums of squares and non-missing counts per column, with a leading zero row
+    finite = np.isfinite(values)
+    x = np.where(finite, values, 0.0)
+    zeros = np.zeros((1, values.shape[1]))
+    return (np.vstack([zeros, np.cumsum(x, axis=0)]), np.vstack([zeros, np.cumsum(x * x, axis=0)]),
+            np.vstack([zeros, np.cumsum(finite, axis=0)]))
+
+
+def rolling_zscores(values, first, window=ROLLING_WINDOW, min_periods=MIN_PERIODS):
+    """
+    (x - mean) / std of every value against the (at most window) preceding non-missing values of
+    its group, for all columns at once; NaN with fewer than min_periods predecessors or zero spread.
+    """
+    s1, s2, sn = prefix_sums(values)
+    hi = np.arange(len(values))
+    lo = np.maximum(first, hi - window)
+    count = sn[hi] - sn[lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (s1[hi] - s1[lo]) / count
+        var = (s2[hi] - s2[lo] - count * mean * mean) / (count - 1)
+        z = (values - mean) / np.sqrt(var)
+    valid = (count >= min_periods) & (var > 1e-12 * np.maximum(mean * mean, 1.0))
+    return np.where(valid & np.isfinite(z), z, np.nan)
+
+
+def segment_sizes(df, starts, min_size=MIN_SEGMENT):
+    # Minimum segment length per group: the given one, or ceil(window_size / step_size) of the
+    # group's windows, so a change point never falls between two windows that share most of their text
+    if min_size is not None:
+        return np.full(len(starts), min_size)
+    if not {"window_size", "step_size"} <= set(df.columns):
+        raise ValueError("min_size is needed for tables without window_size and step_size columns")
+    return -(-df["window_size"].to_numpy()[starts] // df["step_size"].to_numpy()[starts])
+
+
+def binary_segmentation(values, starts, ends, min_size, penalty=PENALTY):
+    """
+    Change points of the mean of every column within every group [start, end) of rows, as row,
+    column, cost reduction and threshold arrays (the row is the first window of the new segment).
+    Segments are split at their best point while the reduction in squared error exceeds
+    penalty * log(non-missing windows of the group) and both parts keep min_size non-missing
+    windows (one size, or one per group); missing values are skipped. All open segments of all
+    groups and columns are searched together, one prefix-sum scan per level.
+    """
+    # Column-major prefix sums, indexed by column * (rows + 1) + row
+    s1, _, sn = (prefix.T.ravel() for prefix in prefix_sums(values))
+    stride = len(values) + 1
+    finite = np.vstack([np.isfinite(values), np.zeros((1, values.shape[1]), dtype=bool)]).T.ravel()
+
+    n_cols = values.shape[1]
+    a = np.tile(np.arange(n_cols), len(starts)) * stride + np.repeat(starts, n_cols)
+    b = a - np.repeat(starts, n_cols) + np.repeat(ends, n_cols)
+    thresholds = penalty * np.log(np.maximum(sn[b] - sn[a], 1))
+    sizes = np.repeat(np.broadcast_to(min_size, len(starts)), n_cols)
+    found = []
+    while True:
+        is_open = sn[b] - sn[a] >= 2 * sizes
+        a, b, thresholds, sizes = a[is_open], b[is_open], thresholds[is_open], sizes[is_open]
+        if not len(a):
+            break
+        # Every split candidate t of every open segment, flattened segment by segment
+        lengths = b - a - 1
+        offsets = np.cumsum(lengths) - lengths
+        t = np.arange(lengths.sum()) + np.repeat(a + 1 - offsets, lengths)
+        n_total, sum_total = sn[b] - sn[a], s1[b] - s1[a]
+        n_left = sn[t] - np.repeat(sn[a], lengths)
+        sum_left = s1[t] - np.repeat(s1[a], lengths)
+        n_right = np.repeat(n_total, lengths) - n_left
+        sum_right = np.repeat(sum_total, lengths) - sum_left
+        size = np.repeat(sizes, lengths)
+        valid = (n_left >= size) & (n_right >= size) & finite[t]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Reduction in squared error; the sums of squares cancel out
+            gains = sum_left ** 2 / n_left + sum_right ** 2 / n_right - np.repeat(sum_total ** 2 / n_total, lengths)
+        gains[~valid] = -np.inf
+
+        best = np.maximum.reduceat(gains, offsets)
+        hits = np.flatnonzero(gains == np.repeat(best, lengths))
+        hit_seg = np.searchsorted(offsets, hits, side="right") - 1
+        first = np.ones(len(hits), dtype=bool)  # first best candidate of each segment
+        first[1:] = hit_seg[1:] != hit_seg[:-1]
+        best_t = t[hits[first]]
+        split = best > thresholds
+        found.append((best_t[split], best[split], thresholds[split]))
+        a, b = np.concatenate([a[split], best_t[split]]), np.concatenate([best_t[split], b[split]])
+        thresholds, sizes = np.tile(thresholds[split], 2), np.tile(sizes[split], 2)
+
+    if not found:
+        return np.array([], dtype=int), np.array([], dtype=int), np.array([]), np.array([])
+    positions, gains, thresholds = (np.concatenate(parts) for parts in zip(*found))
+    return positions % stride, positions // stride, gains, thresholds
+
+
+def detect_changes(df, metrics=None, group_cols=None, order_col="window_start", rolling_window=ROLLING_WINDOW,
+                   rolling_threshold=ROLLING_THRESHOLD, mad_threshold=MAD_THRESHOLD, penalty=PENALTY,
+                   min_size=MIN_SEGMENT):
+    """
+    Flagged windows of a sliding-window metric table as a tidy table: the group columns (section,
+    window_size and step_size, and config for sweep tables), window_start, metric, method
+    ("rolling_z", "robust_z" or "change_point"), the metric value, the score and the threshold it
+    exceeded. Change points are searched on the robust z-scores, so the penalty is in units of the
+    section's MAD; min_size defaults to the overlap of each group's windows (see segment_sizes).
+    """
+    metrics = metrics or metric_columns(df)
+    group_cols = group_cols or [column for column in ("config", "window_size", "step_size", "section")
+                                if column in df.columns]
+    df, first, starts, ends = group_offsets(df, group_cols, order_col)
+    values = df[metrics].to_numpy(dtype=float)
+
+    robust = robust_zscores(df, metrics, group_cols)
+    flagged = []
+    for method, scores, threshold in (("rolling_z", rolling_zscores(values, first, rolling_window), rolling_threshold),
+                                      ("robust_z", robust, mad_threshold)):
+        rows, cols = np.nonzero(np.abs(np.nan_to_num(scores)) > threshold)
+        flagged.append((method, rows, cols, scores[rows, cols], np.full(len(rows), threshold)))
+    sizes = segment_sizes(df, starts, min_size)
+    flagged.append(("change_point", *binary_segmentation(robust, starts, ends, sizes, penalty)))
+
+    keys = group_cols + [order_col]
+    frames = []
+    for method, rows, cols, scores, thresholds in flagged:
+        frame = df.loc[rows, keys].reset_index(drop=True)
+        frame["metric"] = np.array(metrics, dtype=object)[cols]
+        frame["method"] = method
+        frame["value"] = values[rows, cols]
+        frame["score"] = scores
+        frame["threshold"] = thresholds
+        frames.append(frame)
+    result = pd.concat(frames, ignore_index=True)
+    return result.sort_values(keys + ["metric", "method"], ignore_index=True)[keys + RESULT_COLUMNS]
@@ -0,0 +1,76 @@
+# divergence.py
+# Vectorized Jensen-Shannon distances between topic distributions of text windows.
+# Values equal scipy.spatial.distance.jensenshannon (natural log, rows normalized to sum 1), but
+# whole arrays of window pairs are computed at once: JS(p, q) = H((p + q) / 2) - (H(p) + H(q)) / 2.
+# Window-by-window matrices are built in row blocks so the temporary arrays stay bounded in memory.
+
+import numpy as np
+from scipy.special import xlogy
+
+BLOCK_ELEMENTS = 2 ** 24  # floats in the rows x windows x topics temporary of one block
+
+
+def normalize(probs):
+    probs = np.asarray(probs, dtype=np.float64)
+    return probs / probs.sum(axis=-1, keepdims=True)
+
+
+def neg_entropy(probs):
+    # sum p log p over the last axis, with 0 log 0 = 0
+    return xlogy(probs, probs).sum(axis=-1)
+
+
+def js_from_terms(p, q, p_terms, q_terms):
+    divergence = (p_terms + q_terms) / 2 - neg_entropy((p + q) / 2)
+    return np.sqrt(np.maximum(divergence, 0.0))  # clip rounding noise below 0
+
+
+def paired_js(p, q):
+    """Jensen-Shannon distance between corresponding rows of p and q."""
+    p, q = normalize(p), normalize(q)
+    return js_from_terms(p, q, neg_entropy(p), neg_entropy(q))
+
+
+def lag_js(probs, labels, lag=1):
+    """
+    JS distance between each window and the window lag positions later (length n - lag).
+    Windows are expected in reading order, grouped by section; pairs spanning two sections are NaN,
+    which also leaves gaps at section boundaries when the curve is plotted.
+    """
+    probs = normalize(probs)
+    labels = np.asarray(labels)
+    if len(probs) <= lag:
+        return np.zeros(0)
+    terms = neg_entropy(probs)
+    distances = js_from_terms(probs[:-lag], probs[lag:], terms[:-lag], terms[lag:])
+    distances[labels[:-lag] != labels[lag:]] = np.nan
+    return distances
+
+
+def adjacent_js(probs, labels):
+    return lag_js(probs, labels, lag=1)
+
+
+def iter_js_blocks(probs, block_rows=None):
+    """Yield (first row, rows x windows block) of the all-pairs JS distance matrix."""
+    probs = normalize(probs)
+    n, k = probs.shape
+    terms = neg_entropy(probs)
+    if block_rows is None:
+        block_rows = max(1, BLOCK_ELEMENTS // max(1, n * k))
+    for start in range(0, n, block_rows):
+        p = probs[start:start + block_rows, None, :]
+        yield start, js_from_terms(p, probs[None, :, :], terms[start:start + block_rows, None], terms[None, :])
+
+
+def pairwise_js(probs, block_rows=None, out=None):
+    """
+    Window x window JS distance matrix. out may be a preallocated array (e.g. an np.memmap of
+    dtype float32) for corpora whose matrix does not fit in memory as float64.
+    """
+    n = len(probs)
+    if out is None:
+        out = np.empty((n, n))
+    for start, block in iter_js_blocks(probs, block_rows):
+        out[start:start + len(block)] = block
+    return out
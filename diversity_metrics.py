@@ -0,0 +1,147 @@
+# diversity_metrics.py
+# Streaming lexical-diversity metrics for sliding windows (TTR, MTLD, MATTR, HD-D).
+# Tokens are mapped to integer ids once per section; a sliding multiset of type counts is then
+# updated by the tokens entering and leaving each window instead of rebuilding a set per window.
+# Definitions follow lexical_diversity.lex_div (ttr, mtld, mattr, hdd); see exam_lexical_diversity.py.
+
+import numpy as np
+
+MTLD_THRESHOLD = 0.72
+MTLD_MIN_LENGTH = 10  # minimum factor length, as in ld.mtld(text, min=10)
+MATTR_WINDOW = 50
+HDD_SAMPLE = 42
+
+
+def encode_tokens(tokens):
+    """Map tokens to dense integer ids; returns the id list and the number of types."""
+    vocab = {}
+    ids = [vocab.setdefault(token, len(vocab)) for token in tokens]
+    return ids, len(vocab)
+
+
+def window_starts(n_tokens, window_size, step_size):
+    return range(0, n_tokens - window_size + 1, step_size)
+
+
+class TypeCounts:
+    """
+    Multiset of type counts for the current window.
+    With a weight table, also keeps sum(weights[count]) over all types up to date (weights[0] == 0).
+    """
+
+    def __init__(self, n_types, weights=None):
+        self.counts = [0] * n_types
+        self.types = 0
+        self.weights = weights
+        self.weighted = 0.0
+
+    def add(self, type_id):
+        count = self.counts[type_id]
+        if count == 0:
+            self.types += 1
+        if self.weights is not None:
+            self.weighted += self.weights[count + 1] - self.weights[count]
+        self.counts[type_id] = count + 1
+
+    def remove(self, type_id):
+        count = self.counts[type_id]
+        if count == 1:
+            self.types -= 1
+        if self.weights is not None:
+            self.weighted += self.weights[count - 1] - self.weights[count]
+        self.counts[type_id] = count - 1
+
+
+def slide(ids, window_size, step_size, state):
+    # Moves state over each window in turn: O(step) updates per window, O(n) overall
+    lo = hi = 0
+    for start in window_starts(len(ids), window_size, step_size):
+        # Drop the tokens that left the window, then add the new ones (skipping any gap)
+        while lo < min(start, hi):
+            state.remove(ids[lo])
+            lo += 1
+        lo, hi = start, max(hi, start)
+        while hi < start + window_size:
+            state.add(ids[hi])
+            hi += 1
+        yield start
+
+
+def sliding_ttr(ids, n_types, window_size, step_size):
+    state = TypeCounts(n_types)
+    return np.array([state.types / window_size for _ in slide(ids, window_size, step_size, state)])
+
+
+def sliding_mattr(ids, n_types, window_size, step_size, mattr_window=MATTR_WINDOW):
+    """
+    Moving-average TTR of each window: the step-1 TTR of every mattr_window-long sub-window is
+    computed once for the whole section, and each window averages its sub-windows via a prefix sum.
+    Windows no longer than mattr_window fall back to their plain TTR, as in ld.mattr.
+    """
+    if window_size < mattr_window + 1:
+        return sliding_ttr(ids, n_types, window_size, step_size)
+    sub_ttr = sliding_ttr(ids, n_types, mattr_window, 1)
+    sums = np.zeros(len(sub_ttr) + 1)
+    np.cumsum(sub_ttr, out=sums[1:])
+    starts = np.array(window_starts(len(ids), window_size, step_size), dtype=np.int64)
+    n_sub = window_size - mattr_window + 1
+    return (sums[starts + n_sub] - sums[starts]) / n_sub
+
+
+def hdd_weights(window_size, sample_size=HDD_SAMPLE):
+    # Probability that a type occurring c times is drawn at least once in a random sample,
+    # divided by the sample size; P(0 draws) = prod_i (N - c - i) / (N - i)
+    if window_size < sample_size:
+        return [0.0] * (window_size + 1)  # ld.hdd scores windows shorter than the sample as 0
+    counts = np.arange(window_size + 1)[:, None]
+    draws = np.arange(sample_size)[None, :]
+    p_none = np.prod(np.clip(window_size - counts - draws, 0, None) / (window_size - draws), axis=1)
+    return ((1.0 - p_none) / sample_size).tolist()
+
+
+def sliding_hdd(ids, n_types, window_size, step_size, sample_size=HDD_SAMPLE):
+    state = TypeCounts(n_types, hdd_weights(window_size, sample_size))
+    return np.array([state.weighted for _ in slide(ids, window_size, step_size, state)])
+
+
+def sliding_mtld(ids, n_types, window_size, step_size, threshold=MTLD_THRESHOLD, min_length=MTLD_MIN_LENGTH):
+    """
+    Bidirectional MTLD of each window. Factors are counted over id arrays with an epoch-stamped
+    seen table, so starting a new factor costs O(1) instead of clearing a set.
+    """
+    seen = [-1] * n_types
+    epoch = 0
+
+    def factor_mtld(window):
+        nonlocal epoch
+        epoch += 1
+        types = length = 0
+        factors = 0.0
+        last = len(window) - 1
+        for x, type_id in enumerate(window):
+            if seen[type_id] != epoch:
+                seen[type_id] = epoch
+                types += 1
+            length += 1
+            if x == last:
+                factors += (1 - types / length) / (1 - threshold)
+            elif types / length < threshold and length >= min_length:
+                factors += 1
+                epoch += 1
+                types = length = 0
+        return len(window) / factors if factors else 0
+
+    scores = []
+    for start in window_starts(len(ids), window_size, step_size):
+        window = ids[start: start + window_size]
+        scores.append((factor_mtld(window) + factor_mtld(window[::-1])) / 2)
+    return np.array(scores)
+
+
+def diversity_metric_arrays(ids, n_types, window_size, step_size):
+    return {
+        "TTR": sliding_ttr(ids, n_types, window_size, step_size),
+        "MTLD": sliding_mtld(ids, n_types, window_size, step_size),
+        "MATTR": sliding_mattr(ids, n_types, window_size, step_size),
+        "HDD": sliding_hdd(ids, n_types, window_size, step_size),
+    }
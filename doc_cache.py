@@ -0,0 +1,93 @@
+# doc_cache.py
+# On-disk cache of parsed spaCy Docs shared by every analysis script.
+# Each section is stored as a DocBin keyed by a hash of its text plus the pipeline that parsed it,
+# so the novel is only re-parsed when the text or the model actually changes.
+
+import hashlib
+import json
+import os
+import time
+
+import spacy
+from spacy.tokens import DocBin
+
+CACHE_DIR = ".doc_cache"
+MAX_CACHE_BYTES = 2 * 1024 ** 3  # size cap, least recently used entries are evicted first
+MAX_CACHE_AGE = 30 * 24 * 3600  # entries unused for this many seconds are considered stale
+
+
+def model_fingerprint(nlp, variant=""):
+    # Model name/version, spaCy version and the full pipeline config (added pipes change the key);
+    # variant separates Docs of the same text produced by different parsing strategies
+    meta = nlp.meta
+    payload = json.dumps({
+        "variant": variant,
+        "model": f"{meta.get('lang')}_{meta.get('name')}",
+        "version": meta.get("version"),
+        "spacy": spacy.__version__,
+        "pipes": nlp.pipe_names,
+    }, sort_keys=True) + nlp.config.to_str()
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_path(fingerprint, text):
+    return os.path.join(CACHE_DIR, f"{fingerprint}_{text_hash(text)}.spacy")
+
+
+def load_doc(nlp, text, fingerprint=None):
+    path = cache_path(fingerprint or model_fingerprint(nlp), text)
+    try:
+        with open(path, "rb") as f:
+            doc_bin = DocBin().from_bytes(f.read())
+    except FileNotFoundError:
+        return None
+    os.utime(path)  # mark as recently used
+    return next(iter(doc_bin.get_docs(nlp.vocab)))
+
+
+def save_doc(doc, text, fingerprint):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(fingerprint, text)
+    doc_bin = DocBin()
+    doc_bin.add(doc)
+    # Write to a temporary file first so concurrent scripts never read a half-written entry
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(doc_bin.to_bytes())
+    os.replace(tmp_path, path)
+    evict()
+
+
+def evict(max_bytes=MAX_CACHE_BYTES, max_age=MAX_CACHE_AGE):
+    if not os.path.isdir(CACHE_DIR):
+        return
+    now = time.time()
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".spacy"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+            if now - stat.st_mtime > max_age:
+                os.remove(path)
+                continue
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    # Drop least recently used entries until the cache fits under the size cap
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
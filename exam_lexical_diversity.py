@@ -0,0 +1,27 @@
+import json
+import os
+
+import numpy as np
+from lexical_diversity import lex_div as ld
+
+from diversity_metrics import diversity_metric_arrays, encode_tokens
+
+# Check the streaming diversity metrics against lexical_diversity on every processed section
+window_size = 500
+step_size = 100
+reference = {"TTR": ld.ttr, "MTLD": ld.mtld, "MATTR": ld.mattr, "HDD": ld.hdd}
+
+for fname in os.listdir("processed"):
+    if fname.endswith(".jsonl"):
+        tokens = []
+        with open(os.path.join("processed", fname), encoding="utf-8") as f:
+            for line in f:
+                tokens.extend(json.loads(line)["tokens"])
+        ids, n_types = encode_tokens(tokens)
+        fast = diversity_metric_arrays(ids, n_types, window_size, step_size)
+        starts = range(0, len(tokens) - window_size + 1, step_size)
+        for metric, func in reference.items():
+            slow = np.array([func(tokens[start: start + window_size]) for start in starts])
+            max_diff = np.max(np.abs(slow - fast[metric])) if len(slow) else 0
+            print(f"{fname} {metric}: max abs difference = {max_diff:.2e}")
+        print("-" * 40)
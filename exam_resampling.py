@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from resampling import block_permutation_test
+
+# Check the block permutation test on synthetic sections: a metric that is constant in every window
+# has no F and must get no p-value, a shifted metric a small one and pure noise a large one
+rng = np.random.default_rng(0)
+sections = np.repeat(["A", "B", "C"], 200)
+df = pd.DataFrame({
+    "section": sections,
+    "window_size": 500,
+    "step_size": 100,
+    "window_start": np.tile(np.arange(200) * 100, 3),
+    "Constant": 1.0,
+    "Shifted": rng.normal(size=len(sections)) + (sections == "C"),
+    "Noise": rng.normal(size=len(sections)),
+})
+metrics = ["Constant", "Shifted", "Noise"]
+
+observed, p_values = block_permutation_test(df, metrics, n_replicates=500, workers=1)
+for metric, f_value, p_value in zip(metrics, observed, p_values):
+    print(f"{metric}: F = {f_value:.3f}, p = {p_value:.4f}")
+print("Constant metric has no p-value:", bool(np.isnan(p_values[0])))
@@ -1,21 +1,19 @@
-import spacy
+from model_server import load_nlp
+from parse_service import load_section_doc
+from window_engine import SWEEP_CONFIGS, section_texts
 
-nlp = spacy.load("en_core_web_sm")
+nlp = load_nlp()
 
-with open("corpus/April eighth, 1928.xml", encoding="utf-8") as f:
-    text = f.read()
-
-doc = nlp(text)
-tokens = [token.text for token in doc if token.is_alpha]
+doc = load_section_doc(nlp, "corpus/April eighth, 1928.xml")
+tokens = section_texts(doc)
 
 print(f"Total tokens in section: {len(tokens)}")
 
-window_size = 200
-step_size = 100
-num_windows = (len(tokens) - window_size) // step_size + 1
-print(f"Number of sliding windows: {num_windows}")
+for window_size, step_size in SWEEP_CONFIGS:
+    num_windows = (len(tokens) - window_size) // step_size + 1
+    print(f"Number of sliding windows ({window_size}/{step_size}): {num_windows}")
 
-# Print first 3 windows tokens (only first 20 tokens each)
-for i in range(min(3, num_windows)):
-    window_tokens = tokens[i*step_size : i*step_size + window_size]
-    print(f"Window {i+1} tokens sample: {window_tokens[:20]}")
+    # Print first 3 windows tokens (only first 20 tokens each)
+    for i in range(min(3, num_windows)):
+        window_tokens = tokens[i*step_size : i*step_size + window_size]
+        print(f"Window {i+1} tokens sample: {window_tokens[:20]}")
@@ -0,0 +1,23 @@
+import time
+
+import numpy as np
+
+from topic_model import infer_topic_matrix, load_topic_model
+
+# Check batched topic inference against per-window get_document_topics on the latest saved model
+topic_model = load_topic_model()
+corpus = topic_model.corpus()
+
+start_time = time.perf_counter()
+slow = np.zeros((len(corpus), topic_model.num_topics))
+for row_index, doc in enumerate(corpus):
+    for topic_id, prob in topic_model.lda.get_document_topics(doc, minimum_probability=0):
+        slow[row_index][topic_id] = prob
+slow_time = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+fast = infer_topic_matrix(topic_model.lda, corpus)
+fast_time = time.perf_counter() - start_time
+
+print(f"{len(corpus)} windows: max abs difference = {np.max(np.abs(fast - slow)):.1e} "
+      f"({fast_time:.2f}s batched vs {slow_time:.2f}s get_document_topics)")
@@ -0,0 +1,33 @@
+import time
+
+from nltk import download
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from model_server import polarity_scores
+from token_store import TokenStore
+from vader_windows import sliding_compound
+
+# Check the incremental VADER window scores against polarity_scores on every section of the token store
+download('vader_lexicon')
+sid = SentimentIntensityAnalyzer()
+window_size = 500
+step_size = 400
+
+store = TokenStore()
+for section in store.sections:
+    keep = store.section_column('keep', section)
+    tokens = store.strings('word', store.section_column('word', section)[keep]).tolist()
+
+    start_time = time.perf_counter()
+    fast = sliding_compound(sid, tokens, window_size, step_size)
+    fast_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    # Reference scores from polarity_scores (answered by the model server when it is running)
+    slow = [scores['compound'] for scores in polarity_scores(
+        ' '.join(tokens[start: start + window_size]) for start in range(0, len(tokens) - window_size + 1, step_size))]
+    slow_time = time.perf_counter() - start_time
+
+    max_diff = max((abs(a - b) for a, b in zip(fast, slow)), default=0)
+    print(f"{section}: {len(fast)} windows, max abs difference = {max_diff:.1e} "
+          f"({fast_time:.2f}s incremental vs {slow_time:.2f}s polarity_scores)")
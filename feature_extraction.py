@@ -1,15 +1,16 @@
 # feature_extraction.py
 # Expanded stylistic feature extraction including advanced metrics
 
-import os
-import spacy
 import pandas as pd
 from lexicalrichness import LexicalRichness
 from collections import Counter
 import textstat  # pip install textstat
 
+from model_server import load_nlp
+from parse_service import load_section_docs
+
 # Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+nlp = load_nlp()
 
 
 # Define subordinate clause counter using dependency parsing
@@ -39,20 +40,11 @@ def mean_clause_length(doc):
 
 
 # Process each section file
-sections = [f.replace('.xml', '') for f in os.listdir('corpus') if f.endswith('.xml')]
+section_docs = load_section_docs(nlp)
 results = []
 
-for section in sections:
-    path = os.path.join('corpus', f'{section}.xml')
-    text = []
-    with open(path, encoding='utf-8') as f:
-        for line in f:
-            if '<p>' in line:
-                # strip XML tags
-                content = line.replace('<p>', '').replace('</p>', '').strip()
-                text.append(content)
-    full_text = ' '.join(text)
-    doc = nlp(full_text)
+for section, doc in section_docs.items():
+    full_text = doc.text
     tokens = [tok for tok in doc if tok.is_alpha]
     num_sents = len(list(doc.sents))
     num_tokens = len(tokens)
@@ -0,0 +1,84 @@
+# figure_renderer.py
+# Shared figure rendering for the plotting scripts.
+# A script describes each figure as Figure(output, plot, data, params): plot(data, **params) draws
+# and returns a matplotlib Figure. Figures are rendered with the Agg backend in a process pool whose
+# workers register the bundled fonts once, and a figure is skipped when its data, parameters,
+# plotting code and the global matplotlib style (rcParams, which sns.set() and the scripts change at
+# module level) hash to the same key as its last render (see artifact_store.py).
+
+import inspect
+import os
+from collections import namedtuple
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.font_manager as fm  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+
+from artifact_store import ArtifactStore, data_hash  # noqa: E402
+from process_pool import default_workers, fork_pool  # noqa: E402
+
+FONT_PATHS = ["times.ttf"]
+N_WORKERS = default_workers()
+
+Figure = namedtuple("Figure", ["output", "plot", "data", "params", "savefig"], defaults=[{}, {}])
+
+_fonts_registered = False
+
+
+def register_fonts(font_paths=FONT_PATHS):
+    # Makes the bundled fonts (times.ttf is "Times New Roman") available by family name
+    global _fonts_registered
+    if not _fonts_registered:
+        for path in font_paths:
+            if os.path.exists(path):
+                fm.fontManager.addfont(path)
+        _fonts_registered = True
+
+
+def init_worker():
+    matplotlib.use("Agg")
+    register_fonts()
+
+
+def figure_key(figure):
+    try:
+        code = inspect.getsource(figure.plot)
+    except (OSError, TypeError):
+        code = figure.plot.__qualname__
+    style = {name: repr(value) for name, value in matplotlib.rcParams.items()}
+    return data_hash(figure.data, figure.params, figure.savefig, code, style)
+
+
+def render_one(figure):
+    fig = figure.plot(figure.data, **figure.params)
+    fig.savefig(figure.output, **figure.savefig)
+    plt.close(fig)
+    return figure.output
+
+
+def render_figures(figures, workers=N_WORKERS, store=None):
+    """Render the figures that are missing or out of date; returns the paths that were written."""
+    store = store or ArtifactStore()
+    keys = {figure.output: figure_key(figure) for figure in figures}
+    stale = [figure for figure in figures if not store.is_current(figure.output, keys[figure.output])]
+    stale_outputs = {figure.output for figure in stale}  # Figures hold DataFrames, so compare by path
+    for figure in figures:
+        if figure.output not in stale_outputs:
+            print(f"Up to date: {figure.output}")
+
+    executor = fork_pool(min(workers, len(stale)), initializer=init_worker)
+    if executor is None:
+        register_fonts()
+        written = [render_one(figure) for figure in stale]
+    else:
+        with executor:
+            written = list(executor.map(render_one, stale))
+
+    for output in written:
+        store.record(output, keys[output])
+        print(f"Saved: {output}")
+    store.save()
+    return written
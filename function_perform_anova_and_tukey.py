@@ -1,8 +1,9 @@
 import pandas as pd
-import statsmodels.api as sm
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
 
-def perform_anova_and_tukey(df, metric_col, group_col="section", alpha=0.05):
+from anova_engine import anova_tukey_table
+
+
+def perform_anova_and_tukey(df, metric_col, group_col="section", alpha=0.05, results=None):
     """
     Perform one-way ANOVA and Tukey HSD post-hoc test for a given metric grouped by categories.
 
@@ -11,31 +12,32 @@ def perform_anova_and_tukey(df, metric_col, group_col="section", alpha=0.05):
     - metric_col: string, the column name of the metric to analyze
     - group_col: string, the column name to group by (default 'section')
     - alpha: significance level for tests (default 0.05)
+    - results: optional table from anova_tukey_table covering metric_col, to print without recomputing
 
     Returns:
     - None, prints test results
     """
-    # Group data by the specified category
-    groups = [group[metric_col].dropna() for _, group in df.groupby(group_col)]
+    if results is None:
+        results = anova_tukey_table(df, [metric_col], group_col=group_col, alpha=alpha)
+    metric_results = results[results["metric"] == metric_col]
+    anova = metric_results[metric_results["test"] == "ANOVA"].iloc[0]
 
     # Skip if any group has no variance (all values identical)
-    if any(len(g.unique()) == 1 for g in groups):
+    if anova["constant_group"]:
         print(f"Skipping {metric_col} due to no variation within at least one group.")
         return
 
-    # Fit OLS model for ANOVA
-    model = sm.OLS(df[metric_col], pd.get_dummies(df[group_col])).fit()
-    anova_results = sm.stats.anova_lm(model, typ=1)
-    f_val = anova_results["F"][0]
-    p_val = anova_results["PR(>F)"][0]
+    f_val = anova["statistic"]
+    p_val = anova["p_value"]
 
     print(f"ANOVA result for {metric_col}: F = {f_val:.3f}, p = {p_val:.4f}")
 
-    # Perform Tukey HSD post-hoc test if ANOVA significant
+    # Report Tukey HSD post-hoc test if ANOVA significant
     if p_val < alpha:
         print(f"Tukey HSD post-hoc test for {metric_col}:")
-        tukey = pairwise_tukeyhsd(endog=df[metric_col], groups=df[group_col], alpha=alpha)
-        print(tukey.summary())
+        tukey = metric_results[metric_results["test"] == "Tukey"]
+        print(tukey[["group1", "group2", "statistic", "p_value", "lower", "upper", "reject"]]
+              .rename(columns={"statistic": "meandiff", "p_value": "p-adj"}).to_string(index=False))
 
     print("-" * 50)
 
@@ -47,5 +49,7 @@ if __name__ == "__main__":
                "MTLD", "NounRatio", "VerbRatio", "AdjRatio", "AdvRatio",
                "AvgClauseLength", "MeanDependencyDistance", "SubordinationIndex"]
 
+    # All metrics are tested in one pass, then reported one by one
+    results = anova_tukey_table(df, metrics)
     for metric in metrics:
-        perform_anova_and_tukey(df, metric)
+        perform_anova_and_tukey(df, metric, results=results)
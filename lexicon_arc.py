@@ -0,0 +1,69 @@
+# lexicon_arc.py
+# O(n) lexicon sentiment arcs.
+# A polarity lexicon is loaded once into a sorted table of spaCy string hashes; every alpha token of
+# a section is then marked positive/negative with one vectorized lookup, and the score of every
+# sliding window comes from cumulative sums of those marks instead of rescanning each window.
+
+import numpy as np
+from spacy.attrs import IS_ALPHA, LOWER
+
+POSITIVE = 1
+NEGATIVE = 2
+
+
+class Lexicon:
+    """Lookup table from lower-cased word hashes to polarity flags (POSITIVE, NEGATIVE or both)."""
+
+    def __init__(self, vocab, positive_words, negative_words):
+        flags = {}
+        for words, flag in ((positive_words, POSITIVE), (negative_words, NEGATIVE)):
+            for word in words:
+                key = vocab.strings.add(word.lower())
+                flags[key] = flags.get(key, 0) | flag
+        self.keys = np.array(sorted(flags), dtype=np.uint64)
+        self.flags = np.array([flags[int(key)] for key in self.keys], dtype=np.uint8)
+
+    def lookup(self, hashes):
+        if not len(self.keys):
+            return np.zeros(len(hashes), dtype=np.uint8)
+        idx = np.minimum(np.searchsorted(self.keys, hashes), len(self.keys) - 1)
+        return np.where(self.keys[idx] == hashes, self.flags[idx], 0).astype(np.uint8)
+
+
+def read_word_list(path):
+    # One word per line (Bing Liu opinion lexicon style); ';' starts a comment line
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return {line.strip() for line in f if line.strip() and not line.startswith(";")}
+
+
+def read_nrc(path):
+    # NRC Emotion Lexicon: word<TAB>emotion<TAB>0/1, using the positive/negative emotions
+    positive, negative = set(), set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.strip().split("\t")
+            if len(parts) == 3 and parts[2] == "1":
+                if parts[1] == "positive":
+                    positive.add(parts[0])
+                elif parts[1] == "negative":
+                    negative.add(parts[0])
+    return positive, negative
+
+
+def mark_tokens(doc, lexicon):
+    """Positive and negative marks (0/1) for the alpha tokens of a section; polarity = pos - neg."""
+    values = doc.to_array([LOWER, IS_ALPHA])
+    flags = lexicon.lookup(values[values[:, 1] == 1, 0])
+    return (flags & POSITIVE) > 0, (flags & NEGATIVE) > 0
+
+
+def arc_scores(positive, negative, window_size, step_size):
+    """(pos - neg) / (pos + neg) of every window, 0 for windows without lexicon words."""
+    starts = np.arange(0, len(positive) - window_size + 1, step_size)
+    pos_sums = np.concatenate(([0], np.cumsum(positive)))
+    neg_sums = np.concatenate(([0], np.cumsum(negative)))
+    pos_count = pos_sums[starts + window_size] - pos_sums[starts]
+    neg_count = neg_sums[starts + window_size] - neg_sums[starts]
+    total = pos_count + neg_count
+    scores = np.divide(pos_count - neg_count, total, out=np.zeros(len(starts)), where=total > 0)
+    return np.round(np.clip(scores, -1.0, 1.0), 4)
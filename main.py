@@ -1,12 +1,28 @@
 import re
 import os
-import subprocess
+import json
 import hashlib
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape, quoteattr
+
+from lxml import etree
 
 # Input and output paths
 txt_path = 'the_sound_and_the_fury.txt'  # English original text
 output_dir = 'corpus'
 os.makedirs(output_dir, exist_ok=True)
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tei_lite.rng')
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# Section headings of The Sound and the Fury; manifest works supply their own pattern
+SECTION_PATTERN = r"\b(APRIL SEVENTH, 1928|JUNE SECOND, 1910|APRIL SIXTH, 1928|APRIL EIGHTH, 1928)\b"
+REGISTRY_PATH = os.path.join(output_dir, 'works.json')
+
+# Structured validation result: errors are (line, column, message) tuples
+ValidationResult = namedtuple('ValidationResult', ['path', 'valid', 'errors'])
+_schema = None  # compiled once per process
 
 
 # Read the full text
@@ -16,10 +32,9 @@ def read_text(path):
 
 
 # Split into sections
-def split_sections(raw_text):
-    # Pattern matches section headings (case-insensitive)
-    pattern = re.compile(r"\b(APRIL SEVENTH, 1928|JUNE SECOND, 1910|APRIL SIXTH, 1928|APRIL EIGHTH, 1928)\b",
-                         re.IGNORECASE)
+def split_sections(raw_text, section_pattern=SECTION_PATTERN):
+    # Pattern matches section headings (case-insensitive) and must capture the heading in one group
+    pattern = re.compile(section_pattern, re.IGNORECASE)
     parts = pattern.split(raw_text)
     split_result = []
     # parts: [..., heading, content, heading, content, ...]
@@ -30,40 +45,134 @@ def split_sections(raw_text):
     return split_result
 
 
-# Wrap content in TEI-lite
-def wrap_tei(section_title, section_content):
-    # Split paragraphs by blank lines
-    paras = re.split(r"\n\s*\n", section_content)
-    # Build TEI document
-    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<TEI xmlns="http://www.tei-c.org/ns/1.0">', '  <text>',
-             '    <body>', f'      <div type="section" xml:id="{section_title}">']
-    # Add paragraphs
-    for p in paras:
-        p = p.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        lines.append(f'        <p>{p.strip()}</p>')
-    lines.append('      </div>')
-    lines.append('    </body>')
-    lines.append('  </text>')
-    lines.append('</TEI>')
-    return '\n'.join(lines)
-
-
-# Validate XML using xmllint (requires it to be installed)
+# Stream paragraphs (separated by blank lines) out of a section without building a list
+def iter_paragraphs(section_content):
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(section_content):
+        yield section_content[start:match.start()]
+        start = match.end()
+    yield section_content[start:]
+
+
+# xml:id values must be NCNames, so the title itself goes into the n attribute
+def section_id(section_title):
+    slug = re.sub(r'\W+', '_', section_title).strip('_')
+    return slug if re.match(r'[^\W\d]', slug) else f's_{slug}'
+
+
+# Stream-write a section as TEI-lite, escaping text and attribute values
+def write_tei(file_handle, section_title, section_content):
+    file_handle.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                      '<TEI xmlns="http://www.tei-c.org/ns/1.0">\n'
+                      '  <text>\n'
+                      '    <body>\n'
+                      f'      <div type="section" xml:id={quoteattr(section_id(section_title))} n={quoteattr(section_title)}>\n')
+    for p in iter_paragraphs(section_content):
+        file_handle.write(f'        <p>{escape(p.strip())}</p>\n')
+    file_handle.write('      </div>\n'
+                      '    </body>\n'
+                      '  </text>\n'
+                      '</TEI>')
+
+
+# Validate XML in-process against the TEI-lite schema; returns a structured result
 def validate_xml(file_path):
+    global _schema
+    if _schema is None:
+        _schema = etree.RelaxNG(etree.parse(SCHEMA_PATH))
+    parser = etree.XMLParser()  # own parser, so its error log only holds this file's errors
     try:
-        subprocess.run(['xmllint', '--noout', file_path], check=True)
-        print(f'Validated XML: {file_path}')
-    except subprocess.CalledProcessError:
-        print(f'Validation failed: {file_path}')
+        document = etree.parse(file_path, parser)
+    except etree.XMLSyntaxError:
+        return ValidationResult(file_path, False, [(entry.line, entry.column, entry.message)
+                                                   for entry in parser.error_log])
+    if _schema.validate(document):
+        return ValidationResult(file_path, True, [])
+    return ValidationResult(file_path, False, [(entry.line, entry.column, entry.message)
+                                               for entry in _schema.error_log])
+
+
+# Write and validate one section (runs in a worker process)
+def build_section(task):
+    out_path, section_title, section_content = task
+    with open(out_path, 'w', encoding='utf-8') as file_handle:
+        write_tei(file_handle, section_title, section_content)
+    return validate_xml(out_path)
+
+
+# Load a corpus manifest: {"works": [{"id", "file", "section_pattern", "metadata"}, ...]}
+def load_manifest(path):
+    with open(path, 'r', encoding='utf-8') as file_handle:
+        works = json.load(file_handle)['works']
+    ids = [work['id'] for work in works]
+    duplicates = sorted({work_id for work_id in ids if ids.count(work_id) > 1})
+    if duplicates:
+        raise ValueError(f'Duplicate work ids in {path}: {", ".join(duplicates)}')
+    return works
+
+
+# Read and split one work (runs in a worker process); sections go to corpus/<work id>/
+def split_work(work):
+    raw_text = read_text(work['file'])
+    work_dir = os.path.join(output_dir, work['id'])
+    os.makedirs(work_dir, exist_ok=True)
+    tasks = [(os.path.join(work_dir, f'{section_title}.xml'), section_title, section_content)
+             for section_title, section_content in split_sections(raw_text, work.get('section_pattern', SECTION_PATTERN))]
+    entry = {
+        'id': work['id'],
+        'file': work['file'],
+        'sha256': hashlib.sha256(raw_text.encode('utf-8')).hexdigest(),
+        'metadata': work.get('metadata', {}),
+        'sections': [section_title for _, section_title, _ in tasks],
+    }
+    return entry, tasks
+
+
+# Record ingested works in corpus/works.json, keeping entries of works not in this batch
+def register_works(entries):
+    registry = {}
+    if os.path.exists(REGISTRY_PATH):
+        with open(REGISTRY_PATH, 'r', encoding='utf-8') as file_handle:
+            registry = {entry['id']: entry for entry in json.load(file_handle)['works']}
+    registry.update((entry['id'], entry) for entry in entries)
+    with open(REGISTRY_PATH, 'w', encoding='utf-8') as file_handle:
+        json.dump({'works': list(registry.values())}, file_handle, indent=2, ensure_ascii=False)
+
+
+def report(result):
+    print(f'Written section: {result.path}')
+    if result.valid:
+        print(f'Validated XML: {result.path}')
+    else:
+        print(f'Validation failed: {result.path}')
+        for line, column, message in result.errors:
+            print(f'  line {line}, column {column}: {message}')
 
 
 # Main execution
 if __name__ == '__main__':
-    text = read_text(txt_path)
-    sections = split_sections(text)
-    for section_title, section_content in sections:
-        tei_xml = wrap_tei(section_title, section_content)
-        out_path = os.path.join(output_dir, f'{section_title}.xml')
-        with open(out_path, 'w', encoding='utf-8') as file_handle:
-            file_handle.write(tei_xml)
-        print(f'Written section: {out_path}')
+    parser = argparse.ArgumentParser(description='Split novels into TEI-lite section files.')
+    parser.add_argument('--manifest', help='corpus manifest for batch ingestion of several works')
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor() as pool:
+        if args.manifest:
+            # Works are read and split concurrently, then all their sections are written in one pool
+            split_results = list(pool.map(split_work, load_manifest(args.manifest)))
+            tasks = [task for _, work_tasks in split_results for task in work_tasks]
+        else:
+            text = read_text(txt_path)
+            tasks = [(os.path.join(output_dir, f'{section_title}.xml'), section_title, section_content)
+                     for section_title, section_content in split_sections(text)]
+        results = list(pool.map(build_section, tasks))
+
+    for result in results:
+        report(result)
+    if args.manifest:
+        invalid = {result.path for result in results if not result.valid}
+        entries = []
+        for entry, work_tasks in split_results:
+            entry['valid'] = not any(out_path in invalid for out_path, _, _ in work_tasks)
+            entries.append(entry)
+        register_works(entries)
+        print(f'Registered {len(entries)} works in {REGISTRY_PATH}')
@@ -0,0 +1,233 @@
+# model_server.py
+# Optional resident model server for the analysis scripts.
+# Loading en_core_web_sm and the VADER analyzer takes seconds per script; while this server runs on
+# localhost it keeps both loaded and answers batched parse, lemma-count and sentiment requests.
+# Scripts get their models through load_nlp(), polarity_scores(), sliding_sentiment() and
+# lemma_counts(): these use the server when it answers and load the models in-process otherwise.
+# Usage: python model_server.py [--port N] [--n-process N]   (stop with Ctrl+C)
+
+import argparse
+import json
+import os
+import urllib.request
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import spacy
+from spacy.tokens import DocBin
+from thinc.api import Config
+
+SPACY_MODEL = "en_core_web_sm"
+HOST = "127.0.0.1"
+PORT = int(os.environ.get("MODEL_SERVER_PORT", 8765))
+SERVER_URL = os.environ.get("MODEL_SERVER_URL", f"http://{HOST}:{PORT}")  # empty: never use the server
+PROBE_TIMEOUT = 0.5  # seconds to wait for /info before falling back to in-process models
+CHUNK_TEXTS = 256  # texts per parse request
+BATCH_SIZE = 64
+N_PROCESS = 1
+
+_models = {}
+
+
+# === In-process models (loaded on first use) === #
+def local_nlp(model=SPACY_MODEL):
+    if model not in _models:
+        _models[model] = spacy.load(model)
+    return _models[model]
+
+
+def local_sid():
+    if "vader" not in _models:
+        from nltk import download
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        download('vader_lexicon', quiet=True)
+        _models["vader"] = SentimentIntensityAnalyzer()
+    return _models["vader"]
+
+
+def count_lemmas(docs, alpha_only=True):
+    return [dict(Counter(token.lemma_ for token in doc if token.is_alpha or not alpha_only)) for doc in docs]
+
+
+# === Client === #
+def request(path, payload=None, timeout=None, url=None):
+    """GET (payload None) or POST JSON to the server; returns the raw response body."""
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request((url or SERVER_URL) + path, data=data,
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.read()
+
+
+@lru_cache(maxsize=None)
+def server_info(url=None):
+    """Model info of the running server, or None when no server answers (probed once per process)."""
+    if not (url or SERVER_URL):
+        return None
+    try:
+        return json.loads(request("/info", timeout=PROBE_TIMEOUT, url=url))
+    except (OSError, ValueError):
+        return None
+
+
+class RemoteNLP:
+    """
+    Stand-in for the spaCy pipeline whose parsing happens on the model server.
+    Carries the server pipeline's meta, config and pipe names (so Doc cache fingerprints match an
+    in-process load of the same model) and a blank vocab of the same language; Docs come back as
+    DocBins with every annotation the scripts use.
+    """
+
+    def __init__(self, info, url=None):
+        self.url = url or SERVER_URL
+        self.meta = info["meta"]
+        self.config = Config().from_str(info["config"], interpolate=False)
+        self.pipe_names = info["pipe_names"]
+        self.max_length = info["max_length"]
+        self.vocab = spacy.blank(self.meta["lang"]).vocab
+
+    def parse_batch(self, texts, batch_size, n_process):
+        body = request("/parse", {"texts": texts, "batch_size": batch_size, "n_process": n_process}, url=self.url)
+        return list(DocBin().from_bytes(body).get_docs(self.vocab))
+
+    def pipe(self, texts, as_tuples=False, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        chunk = []
+        for item in texts:
+            chunk.append(item)
+            if len(chunk) == CHUNK_TEXTS:
+                yield from self.pipe_chunk(chunk, as_tuples, batch_size, n_process)
+                chunk = []
+        if chunk:
+            yield from self.pipe_chunk(chunk, as_tuples, batch_size, n_process)
+
+    def pipe_chunk(self, chunk, as_tuples, batch_size, n_process):
+        if not as_tuples:
+            return self.parse_batch(chunk, batch_size, n_process)
+        texts, contexts = zip(*chunk)
+        return zip(self.parse_batch(list(texts), batch_size, n_process), contexts)
+
+    def __call__(self, text):
+        return self.parse_batch([text], BATCH_SIZE, 1)[0]
+
+
+def load_nlp(model=SPACY_MODEL):
+    """The server's pipeline when a server with this model is running, spacy.load(model) otherwise."""
+    info = server_info()
+    if info is not None and info["model"] == model:
+        print(f"Using model server at {SERVER_URL}")
+        return RemoteNLP(info)
+    return local_nlp(model)
+
+
+def polarity_scores(texts):
+    """VADER polarity_scores for each text."""
+    texts = list(texts)
+    if server_info() is not None:
+        try:
+            return json.loads(request("/sentiment", {"texts": texts}))
+        except OSError:
+            pass  # server went away; score in-process
+    sid = local_sid()
+    return [sid.polarity_scores(text) for text in texts]
+
+
+def sliding_sentiment(tokens, window_size, step_size):
+    """VADER compound score of every sliding token window (see vader_windows.sliding_compound)."""
+    if server_info() is not None:
+        payload = {"tokens": list(tokens), "window_size": window_size, "step_size": step_size}
+        try:
+            return json.loads(request("/sliding_sentiment", payload))
+        except OSError:
+            pass  # server went away; score in-process
+    from vader_windows import sliding_compound
+    return sliding_compound(local_sid(), tokens, window_size, step_size)
+
+
+def lemma_counts(texts, alpha_only=True, model=SPACY_MODEL):
+    """Lemma frequencies of each text, as {lemma: count}."""
+    texts = list(texts)
+    info = server_info()
+    if info is not None and info["model"] == model:
+        try:
+            return json.loads(request("/lemma_counts", {"texts": texts, "alpha_only": alpha_only}))
+        except OSError:
+            pass  # server went away; count in-process
+    return count_lemmas(local_nlp(model).pipe(texts, batch_size=BATCH_SIZE), alpha_only)
+
+
+# === Server === #
+class ModelRequestHandler(BaseHTTPRequestHandler):
+    # Requests are handled one at a time (HTTPServer), so the models are never used concurrently
+    model = SPACY_MODEL
+    n_process = N_PROCESS
+
+    def send_body(self, body, content_type="application/json", status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, obj, status=200):
+        self.send_body(json.dumps(obj).encode("utf-8"), status=status)
+
+    def do_GET(self):
+        if self.path != "/info":
+            return self.send_json({"error": f"unknown path {self.path}"}, status=404)
+        nlp = local_nlp(self.model)
+        self.send_json({"model": self.model, "meta": nlp.meta, "config": nlp.config.to_str(),
+                        "pipe_names": nlp.pipe_names, "max_length": nlp.max_length})
+
+    def do_POST(self):
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if self.path == "/parse":
+                doc_bin = DocBin()
+                batch_size = payload.get("batch_size", BATCH_SIZE)
+                n_process = min(payload.get("n_process", 1), self.n_process)
+                for doc in local_nlp(self.model).pipe(payload["texts"], batch_size=batch_size, n_process=n_process):
+                    doc_bin.add(doc)
+                self.send_body(doc_bin.to_bytes(), content_type="application/octet-stream")
+            elif self.path == "/lemma_counts":
+                docs = local_nlp(self.model).pipe(payload["texts"], batch_size=BATCH_SIZE)
+                self.send_json(count_lemmas(docs, payload.get("alpha_only", True)))
+            elif self.path == "/sentiment":
+                sid = local_sid()
+                self.send_json([sid.polarity_scores(text) for text in payload["texts"]])
+            elif self.path == "/sliding_sentiment":
+                from vader_windows import sliding_compound
+                self.send_json([float(score) for score in sliding_compound(
+                    local_sid(), payload["tokens"], payload["window_size"], payload["step_size"])])
+            else:
+                self.send_json({"error": f"unknown path {self.path}"}, status=404)
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_json({"error": f"bad request: {e!r}"}, status=400)
+
+    def log_message(self, format, *args):
+        print(f"[model_server] {self.address_string()} {format % args}")
+
+
+def serve(host=HOST, port=PORT, model=SPACY_MODEL, n_process=N_PROCESS):
+    ModelRequestHandler.model = model
+    ModelRequestHandler.n_process = n_process
+    local_nlp(model)
+    local_sid()
+    server = HTTPServer((host, port), ModelRequestHandler)
+    print(f"Serving {model} and VADER on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the spaCy and VADER models loaded for the analysis scripts.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--model", default=SPACY_MODEL)
+    parser.add_argument("--n-process", type=int, default=N_PROCESS, help="processes per parse request")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.model, args.n_process)
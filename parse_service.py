@@ -0,0 +1,70 @@
+# parse_service.py
+# Shared parsing service for the analysis scripts.
+# Streams the <p> paragraphs of the TEI sections (read by tei_reader.py) through nlp.pipe
+# (batched; on every core, or PARSE_PROCESSES of them, where workers are forked, serially elsewhere),
+# then reassembles each section into a single Doc with global token offsets and sentence
+# boundaries. Paragraph-sized inputs also keep every call well below nlp.max_length.
+
+import multiprocessing
+import os
+
+from spacy.tokens import Doc
+
+from doc_cache import load_doc, model_fingerprint, save_doc
+from tei_reader import read_paragraphs, section_files
+
+CORPUS_DIR = "corpus"
+BATCH_SIZE = 64
+N_PROCESS = int(os.environ.get("PARSE_PROCESSES", 0)) or os.cpu_count() or 1
+PARSE_VARIANT = "paragraphs"  # cache namespace for Docs assembled from paragraph parses
+
+
+def parse_processes(n_process):
+    # spaCy's multiprocess pipe uses the default start method; under spawn every worker would re-run
+    # the calling script (the scripts work at module level), so those platforms parse serially
+    if n_process > 1 and multiprocessing.get_start_method() != "fork":
+        return 1
+    return n_process
+
+
+def parse_files(nlp, files, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+    """
+    Parse (section, path) pairs and return {section: Doc}.
+    Cached sections are loaded from the Doc cache; the paragraphs of all remaining sections are
+    parsed together in one nlp.pipe stream and merged back per section.
+    """
+    fingerprint = model_fingerprint(nlp, PARSE_VARIANT)
+    docs = {}
+    pending = {}
+    for section, path in files:
+        paragraphs = read_paragraphs(path)
+        text = " ".join(paragraphs)
+        docs[section] = load_doc(nlp, text, fingerprint)
+        if docs[section] is None:
+            pending[section] = (paragraphs, text)
+
+    if pending:
+        stream = ((paragraph, (section, i))
+                  for section, (paragraphs, _) in pending.items()
+                  for i, paragraph in enumerate(paragraphs))
+        parts = {section: [] for section in pending}
+        n_process = parse_processes(n_process)
+        for para_doc, (section, i) in nlp.pipe(stream, as_tuples=True, batch_size=batch_size, n_process=n_process):
+            parts[section].append((i, para_doc))
+
+        for section, (_, text) in pending.items():
+            para_docs = [para_doc for _, para_doc in sorted(parts[section], key=lambda part: part[0])]
+            # Doc.from_docs shifts token indices and heads, and keeps each paragraph's sentence starts
+            doc = Doc.from_docs(para_docs) if para_docs else Doc(nlp.vocab, words=[])
+            save_doc(doc, text, fingerprint)
+            docs[section] = doc
+    return docs
+
+
+def load_section_docs(nlp, corpus_dir=CORPUS_DIR, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+    return parse_files(nlp, section_files(corpus_dir), batch_size=batch_size, n_process=n_process)
+
+
+def load_section_doc(nlp, path, batch_size=BATCH_SIZE, n_process=1):
+    section = os.path.basename(path).replace(".xml", "")
+    return parse_files(nlp, [(section, path)], batch_size=batch_size, n_process=n_process)[section]
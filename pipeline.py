@@ -0,0 +1,226 @@
+# pipeline.py
+# Content-hash DAG runner for the analysis scripts.
+# Every stage declares the files/directories it reads and writes; dependencies follow from those
+# paths. A stage runs (as its own Python process) only when the hash of its inputs, its script and
+# the local modules the script imports differs from its last successful run; independent stages
+# run in parallel. Per-stage wall times are kept in .artifacts/pipeline.json.
+# Usage: python pipeline.py [stage ...] [--jobs N] [--force] [--list]
+
+import argparse
+import ast
+import fnmatch
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from artifact_store import ARTIFACT_DIR, data_hash, file_hash
+from report_builder import REPORTS, section_inputs
+
+STATE_PATH = os.path.join(ARTIFACT_DIR, "pipeline.json")
+JOBS = min(4, os.cpu_count() or 1)  # with more than one job, each stage runs single-process
+STYLE_CSV = "style_metrics_sliding_window_full.csv"
+TOKENS = os.path.join("processed", "tokens")
+
+Stage = namedtuple("Stage", ["name", "script", "inputs", "outputs"])
+
+# Outputs may be glob patterns; a file written by two scripts belongs to the one that writes it last
+STAGES = [
+    Stage("tei", "main.py", ["the_sound_and_the_fury.txt", "tei_lite.rng"], ["corpus"]),
+    Stage("preprocess", "Text Preprocessing.py", ["corpus"], ["processed/*.jsonl", TOKENS]),
+    Stage("features", "quantitative_feature_extraction.py", [TOKENS], ["features_summary.csv", "feature_metrics.png"]),
+    Stage("sentiment", "sentiment_arc.py", ["corpus"], ["sentiment_arcs.json"]),
+    Stage("style_windows", "style_metrics_sliding_window.py", ["corpus"], [STYLE_CSV]),
+    Stage("text_mining", "text_mining_analysis.py", [TOKENS],
+          ["topic_windows.csv", "topic_keywords.txt", "sentiment_arcs.png", "summary_topic_heatmap.png",
+           "summary_topic_shift_curve.png"]),
+    Stage("significance", "significance_test.py", [STYLE_CSV],
+          ["anova_tukey_results.csv", "resampling_results.csv", "*_anova_tukey_table.png"]),
+    Stage("boxplots", "by_section_boxplot.py", [STYLE_CSV, "anova_tukey_results.csv"], ["*_by_section_boxplot.png"]),
+    Stage("visualization", "visualization.py", ["features_summary.csv", "sentiment_arcs.json", "topic_windows.csv"],
+          ["*_by_section.png", "smoothed_sentiment_arcs.png", "topic_heatmap.png", "topic_shift_curve.png"]),
+    Stage("word_cloud", "word_cloud.py", ["topic_keywords.txt"], ["word_cloud_*.png"]),
+    Stage("snippets", "extreme&change_position.py", [STYLE_CSV, "corpus"],
+          ["change_points.csv", "detected_snippets.csv"]),
+    Stage("report", "report_builder.py",
+          sorted({path for sections in REPORTS.values() for section in sections for path in section_inputs(section)}),
+          list(REPORTS)),
+]
+
+
+# === Hashing === #
+def path_hash(path):
+    # Files by content; directories by the relative paths and contents of every file below them
+    if os.path.isfile(path):
+        return file_hash(path)
+    hashes = {}
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith(".tmp"):
+                full_path = os.path.join(root, name)
+                hashes[os.path.relpath(full_path, path)] = file_hash(full_path)
+    return data_hash(hashes)
+
+
+def local_imports(script, seen=None):
+    """The script and every module of this repository it imports, directly or indirectly."""
+    seen = seen if seen is not None else set()
+    if script in seen or not os.path.exists(script):
+        return seen
+    seen.add(script)
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_imports(f"{name.split('.')[0]}.py", seen)
+    return seen
+
+
+def stage_key(stage):
+    inputs = {path: path_hash(path) for path in stage.inputs if os.path.exists(path)}
+    code = {path: file_hash(path) for path in sorted(local_imports(stage.script))}
+    return data_hash(stage.script, inputs, code)
+
+
+def outputs_exist(stage):
+    return all(glob.glob(output) if glob.has_magic(output) else os.path.exists(output) for output in stage.outputs)
+
+
+# === Graph === #
+def produces(output, path):
+    if glob.has_magic(output):
+        return fnmatch.fnmatch(path, output)
+    return path == output or path.startswith(output.rstrip("/") + "/")
+
+
+def dependencies(stages):
+    """Stage name -> names of the stages whose outputs it reads (the last writer of each input)."""
+    deps = {}
+    for i, stage in enumerate(stages):
+        deps[stage.name] = set()
+        for path in stage.inputs:
+            writers = [other for other in stages[:i] if any(produces(output, path) for output in other.outputs)]
+            if writers:
+                deps[stage.name].add(writers[-1].name)
+    return deps
+
+
+def select(stages, deps, names):
+    # The requested stages and everything upstream of them, in declaration order
+    wanted = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(deps[name])
+    return [stage for stage in stages if stage.name in wanted]
+
+
+# === Execution === #
+def load_state():
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state):
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    tmp_path = f"{STATE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def stage_env(jobs):
+    # One level of parallelism: stages running side by side parse and render in a single process each
+    env = dict(os.environ)
+    if jobs > 1:
+        env.update(ANALYSIS_WORKERS="1", PARSE_PROCESSES="1")
+    return env
+
+
+def run_stage(stage, force, state, jobs=1):
+    """Runs the stage when its key changed; returns (status, key, seconds)."""
+    key = stage_key(stage)
+    if not force and state.get(stage.name, {}).get("key") == key and outputs_exist(stage):
+        return "skipped", key, 0.0
+    start = time.perf_counter()
+    log_path = os.path.join(ARTIFACT_DIR, "logs", f"{stage.name}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, "w", encoding="utf-8") as log:
+        returncode = subprocess.call([sys.executable, stage.script], stdout=log, stderr=subprocess.STDOUT,
+                                     env=stage_env(jobs))
+    return ("done" if returncode == 0 else "failed"), key, time.perf_counter() - start
+
+
+def run_pipeline(stages, jobs=JOBS, force=False):
+    deps = dependencies(STAGES)
+    state = load_state()
+    status = {}
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(status) < len(stages):
+            for stage in stages:
+                if stage.name in status or stage.name in running.values():
+                    continue
+                upstream = [status.get(name) for name in deps[stage.name] if any(s.name == name for s in stages)]
+                if any(result in ("failed", "blocked") for result in upstream):
+                    status[stage.name] = "blocked"
+                    print(f"[{stage.name}] blocked by a failed upstream stage")
+                elif all(result in ("done", "skipped") for result in upstream):
+                    running[executor.submit(run_stage, stage, force, state, jobs)] = stage.name
+                    print(f"[{stage.name}] queued")
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                result, key, seconds = future.result()
+                status[name] = result
+                if result == "done":
+                    state[name] = {"key": key, "seconds": round(seconds, 2),
+                                   "finished": time.strftime("%Y-%m-%d %H:%M:%S")}
+                    save_state(state)
+                log_note = f" (see {os.path.join(ARTIFACT_DIR, 'logs', name + '.log')})" if result == "failed" else ""
+                print(f"[{name}] {result} in {seconds:.1f}s{log_note}")
+
+    print("\nStage timings (last successful run):")
+    for stage in stages:
+        seconds = state.get(stage.name, {}).get("seconds")
+        print(f"  {stage.name:15s} {status[stage.name]:8s} {'-' if seconds is None else f'{seconds:.1f}s'}")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the analysis scripts as a content-hash DAG.")
+    parser.add_argument("stages", nargs="*", help="stages to run with their upstream stages (default: all)")
+    parser.add_argument("--jobs", type=int, default=JOBS, help="stages run in parallel")
+    parser.add_argument("--force", action="store_true", help="rerun stages even when their inputs are unchanged")
+    parser.add_argument("--list", action="store_true", help="print the stages and their dependencies")
+    args = parser.parse_args()
+
+    stage_deps = dependencies(STAGES)
+    if args.list:
+        for stage in STAGES:
+            print(f"{stage.name:15s} {stage.script:40s} after: {', '.join(sorted(stage_deps[stage.name])) or '-'}")
+        sys.exit(0)
+    unknown = set(args.stages) - {stage.name for stage in STAGES}
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    selected = select(STAGES, stage_deps, args.stages) if args.stages else STAGES
+    results = run_pipeline(selected, jobs=args.jobs, force=args.force)
+    sys.exit(0 if all(result in ("done", "skipped") for result in results.values()) else 1)
@@ -0,0 +1,20 @@
+# process_pool.py
+# Process pools for the analysis scripts. The scripts do their work at module level, so workers are
+# forked: a spawned worker would re-import __main__ and run the whole script again.
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    # ANALYSIS_WORKERS caps the processes of one script (pipeline.py sets it when stages run side by side)
+    return int(os.environ.get("ANALYSIS_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def fork_pool(workers, initializer=None):
+    """ProcessPoolExecutor with forked workers, or None to run serially (one worker, or no fork on this platform)."""
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                               initializer=initializer)
@@ -1,64 +1,43 @@
 # feature_extraction.py
 # Compute MSL, SCR, TTR, and AWL from preprocessed Faulkner section data
 
-import json
-import os
+import numpy as np
 import pandas as pd
-import spacy
 import matplotlib.pyplot as plt
 
+from token_store import TokenStore
+
 # Set Font
 plt.rcParams['font.family'] = 'Times New Roman'
 plt.rcParams['font.size'] = 12
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
-
-# Load data from JSONL files
-data = []
-for fname in os.listdir('processed'):
-    if fname.endswith('.jsonl'):
-        with open(os.path.join('processed', fname), encoding='utf-8') as f:
-            for line in f:
-                data.append(json.loads(line))
-
-df = pd.DataFrame(data)
-
-# === MSL: Mean Sentence Length === #
-df['sentence_length'] = df['tokens'].apply(len)
-msl = df.groupby('section')['sentence_length'].mean().rename('MSL')
-
-
-# === SCR: Subordinate Clause Ratio === #
-def count_sub_clauses(text):
-    doc = nlp(text)
-    return sum(1 for tok in doc if tok.dep_ == 'mark')
-
-
-df['subordinate_clauses'] = df['sentence'].apply(count_sub_clauses)
-scr = df.groupby('section')['subordinate_clauses'].sum() / df.groupby('section')['sentence_id'].count()
-scr.name = 'SCR'
-
-
-# === TTR: Type–Token Ratio === #
-def compute_ttr(token_lists):
-    tokens = [tok for sublist in token_lists for tok in sublist]
-    return len(set(tokens)) / len(tokens) if tokens else 0
-
-
-ttr = df.groupby('section')['tokens'].apply(compute_ttr).rename('TTR')
-
-
-# === AWL: Average Word Length === #
-def avg_word_length(token_lists):
-    tokens = [tok for sublist in token_lists for tok in sublist if tok.isalpha()]
-    return sum(len(tok) for tok in tokens) / len(tokens) if tokens else 0
-
-
-awl = df.groupby('section')['tokens'].apply(avg_word_length).rename('AWL')
+# Open the columnar token store; only the columns used below are mapped
+store = TokenStore()
+mark_id = store.vocab_id('dep', 'mark')
+word_lengths = np.array([len(word) for word in store.vocab('word')])
+
+rows = []
+for section in store.sections:
+    first, last = store.sentence_range(section)
+    num_sents = last - first
+    keep = store.section_column('keep', section)
+    kept_words = store.section_column('word', section)[keep & store.section_column('is_alpha', section)]
+    num_kept = int(keep.sum())
+
+    rows.append({
+        'section': section,
+        # === MSL: Mean Sentence Length (kept tokens per sentence) === #
+        'MSL': num_kept / num_sents if num_sents else 0,
+        # === SCR: Subordinate Clause Ratio (from the stored dependency labels) === #
+        'SCR': int((store.section_column('dep', section) == mark_id).sum()) / num_sents if num_sents else 0,
+        # === TTR: Type–Token Ratio === #
+        'TTR': len(np.unique(store.section_column('word', section)[keep])) / num_kept if num_kept else 0,
+        # === AWL: Average Word Length === #
+        'AWL': word_lengths[kept_words].mean() if len(kept_words) else 0
+    })
 
 # === Combine & Save === #
-features = pd.concat([msl, scr, ttr, awl], axis=1).round(3)
+features = pd.DataFrame(rows).set_index('section').sort_index().round(3)
 features.to_csv('features_summary.csv')
 
 # === Visualize === #
@@ -0,0 +1,155 @@
+# report_builder.py
+# Standalone assembly of the PDF reports from previously computed figures and result tables.
+# Each report is a declarative list of sections; a section's key is the hash of its definition and
+# of its input files, so a report is only rebuilt when one of its sections changed, and only the
+# changed figures are downsampled again (cached under .artifacts/report_images).
+# Usage: python report_builder.py [report.pdf ...]   (all reports by default)
+
+import os
+import sys
+
+import pandas as pd
+from fpdf import FPDF
+from PIL import Image
+
+from artifact_store import ARTIFACT_DIR, ArtifactStore, data_hash, file_hash
+
+IMAGE_DIR = os.path.join(ARTIFACT_DIR, "report_images")
+IMAGE_WIDTH = 180  # mm on the page
+MAX_IMAGE_PIXELS = 1200  # ~170 dpi at IMAGE_WIDTH, plenty for charts
+STYLE_METRICS = ["MSL", "SCR", "TTR", "AWL"]
+
+# === Report definitions === #
+# title: centered title (with text as introduction); heading: section title on a new page (unless
+# new_page is False); image: figure to embed; text: paragraph; text_file: lines of a text file;
+# table: CSV result table, optionally filtered with query and limited to columns.
+REPORTS = {
+    "faulkner_analysis_report.pdf": [
+        {"title": "Faulkner's The Sound and the Fury Text Mining Report",
+         "text": "This report summarizes computational text analysis results, including stylistic features, "
+                 "emotional arcs, topic modeling, and statistical validations across the narrative sections."},
+        *[{"heading": f"{metric} by Narrative Section", "image": f"{metric}_by_section.png",
+           "text": f"The boxplot shows the distribution of {metric} across the four narrative sections."}
+          for metric in STYLE_METRICS],
+        {"heading": "ANOVA of Sliding-Window Style Metrics", "table": "anova_tukey_results.csv",
+         "query": "test == 'ANOVA'", "columns": ["metric", "statistic", "p_value", "p_corrected"]},
+        {"heading": "Smoothed Emotional Arcs by Narrative Section", "image": "smoothed_sentiment_arcs.png",
+         "text": "This line chart displays the smoothed sentiment scores computed over sliding windows, "
+                 "highlighting emotional trajectories for each narrator."},
+        {"heading": "Average Topic Distribution per Section", "image": "topic_heatmap.png",
+         "text": "The heatmap visualizes the average proportion of each topic in the different narrative sections."},
+        {"heading": "Topic Shift Rate (Jensen-Shannon Divergence)", "image": "topic_shift_curve.png",
+         "text": "This plot shows the degree of thematic change between adjacent text windows, "
+                 "with peaks indicating topic shifts in the narrative progression."},
+    ],
+    "faulkner_analysis_summary.pdf": [
+        {"title": "Faulkner Text-Mining Summary Report",
+         "text": "This report summarizes the sentiment and topic modeling analysis for each narrative section in "
+                 "William Faulkner's 'The Sound and the Fury'. It includes emotional arcs, average topic "
+                 "distributions, and topic transitions."},
+        {"image": "sentiment_arcs.png"},
+        {"image": "summary_topic_heatmap.png"},
+        {"image": "summary_topic_shift_curve.png"},
+        {"heading": "Top 10 Keywords per Topic:", "text_file": "topic_keywords.txt"},
+    ],
+}
+
+
+def section_inputs(section):
+    return [section[field] for field in ("image", "text_file", "table") if field in section]
+
+
+def section_key(section, input_hashes):
+    return data_hash(section, {path: input_hashes[path] for path in section_inputs(section)})
+
+
+def downsampled_image(path, image_hash, max_pixels=MAX_IMAGE_PIXELS):
+    """RGB copy of a figure no wider than max_pixels, cached by the hash of the source file."""
+    out_path = os.path.join(IMAGE_DIR, f"{image_hash[:16]}_{max_pixels}.png")
+    if not os.path.exists(out_path):
+        os.makedirs(IMAGE_DIR, exist_ok=True)
+        with Image.open(path) as image:
+            image = image.convert("RGB")  # FPDF cannot embed alpha channels
+            image.thumbnail((max_pixels, max_pixels * image.height // image.width), Image.LANCZOS)
+            tmp_path = f"{out_path}.{os.getpid()}.tmp"
+            image.save(tmp_path, format="PNG", optimize=True)
+        os.replace(tmp_path, out_path)
+        print(f"Downsampled: {path}")
+    return out_path
+
+
+def render_section(pdf, section, input_hashes):
+    if "title" in section:
+        pdf.add_page()
+        pdf.set_font("Times", 'B', 16)
+        pdf.cell(0, 10, section["title"], ln=True, align="C")
+        pdf.ln(10)
+    elif "heading" in section:
+        if section.get("new_page", True):
+            pdf.add_page()
+        pdf.set_font("Times", 'B', 14)
+        pdf.cell(0, 10, section["heading"], ln=True)
+
+    if "image" in section:
+        pdf.ln(5)
+        pdf.image(downsampled_image(section["image"], input_hashes[section["image"]]), w=IMAGE_WIDTH)
+        pdf.ln(5)
+    if "table" in section:
+        table = pd.read_csv(section["table"])
+        if "query" in section:
+            table = table.query(section["query"])
+        table = table[section.get("columns", list(table.columns))]
+        width = (pdf.w - pdf.l_margin - pdf.r_margin) / len(table.columns)
+        pdf.set_font("Times", 'B', 10)
+        for column in table.columns:
+            pdf.cell(width, 7, str(column), border=1, align="C")
+        pdf.ln()
+        pdf.set_font("Times", '', 10)
+        for row in table.itertuples(index=False):
+            for value in row:
+                pdf.cell(width, 7, f"{value:.4g}" if isinstance(value, float) else str(value), border=1, align="C")
+            pdf.ln()
+    if "text" in section:
+        pdf.set_font("Times", '', 12 if "title" in section else 11)
+        pdf.multi_cell(0, 10, section["text"])
+    if "text_file" in section:
+        pdf.set_font("Times", '', 10)
+        with open(section["text_file"], encoding="utf-8") as f:
+            for line in f:
+                pdf.multi_cell(0, 5, line.strip())
+
+
+def build_report(output, sections, store):
+    """Rebuild output when a section's key differs from the last build; returns True when written."""
+    available = [section for section in sections if all(os.path.exists(path) for path in section_inputs(section))]
+    for section in sections:
+        if section not in available:
+            print(f"Skipping section with missing inputs: {section_inputs(section)}")
+    input_hashes = {path: file_hash(path) for section in available for path in section_inputs(section)}
+    keys = [section_key(section, input_hashes) for section in available]
+
+    key = data_hash(keys)
+    if store.is_current(output, key):
+        print(f"Up to date: {output}")
+        return False
+    previous = set(store.entries.get(output, {}).get("inputs", []))
+    changed = sum(section_key_entry not in previous for section_key_entry in keys)
+    print(f"Rebuilding {output}: {changed} of {len(keys)} sections changed")
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    for section in available:
+        render_section(pdf, section, input_hashes)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    pdf.output(tmp_path)
+    os.replace(tmp_path, output)
+    store.record(output, key, inputs=keys)  # section keys, to report which sections change next time
+    print(f"Saved: {output}")
+    return True
+
+
+if __name__ == "__main__":
+    store = ArtifactStore()
+    for name in sys.argv[1:] or list(REPORTS):
+        build_report(name, REPORTS[name], store)
+    store.save()
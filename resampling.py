@@ -0,0 +1,165 @@
+# resampling.py
+# Moving-block bootstrap and block label permutation tests for the sliding-window metrics.
+# Overlapping windows of one section are strongly autocorrelated (a window shares text with the
+# next ceil(window_size / step_size) - 1 windows), so windows are resampled in contiguous blocks
+# of that many windows, read per section from the table, rather than one by one.
+# Replicates are drawn as NumPy index/label matrices in fixed-size chunks; every chunk gets its own
+# child of one SeedSequence, so results are identical for any number of worker processes.
+
+import numpy as np
+import pandas as pd
+
+from process_pool import default_workers, fork_pool
+
+RESULTS_PATH = "resampling_results.csv"
+N_REPLICATES = 2000
+CHUNK_SIZE = 250  # replicates per task
+BLOCK_LENGTH = None  # None: ceil(window_size / step_size) of each section's windows
+SEED = 42
+CONFIDENCE = 0.95
+N_WORKERS = default_workers()
+
+
+def section_values(df, metrics, group_col="section", order_col="window_start"):
+    # Sorted section names and, per section, its windows x metrics array in reading order
+    df = df.sort_values([group_col, order_col])
+    sections = sorted(df[group_col].unique())
+    return sections, [df.loc[df[group_col] == section, metrics].to_numpy(dtype=float) for section in sections]
+
+
+def block_lengths(df, sections, block_length=BLOCK_LENGTH, group_col="section"):
+    # Block length per section: the given one, or the number of windows spanned by one window's text
+    if block_length is not None:
+        return [block_length] * len(sections)
+    if not {"window_size", "step_size"} <= set(df.columns):
+        raise ValueError("block_length is needed for tables without window_size and step_size columns")
+    geometry = df.groupby(group_col)[["window_size", "step_size"]].first().loc[sections]
+    return (-(-geometry["window_size"] // geometry["step_size"])).astype(int).tolist()
+
+
+def run_chunks(func, n_replicates, chunk_size, seed, args, workers):
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_replicates // chunk_size))
+    tasks = [(args, min(chunk_size, n_replicates - i * chunk_size), child) for i, child in enumerate(seeds)]
+    executor = fork_pool(min(workers, len(tasks)))
+    if executor is None:
+        return list(map(func, tasks))
+    with executor:
+        return list(executor.map(func, tasks))
+
+
+# === Moving-block bootstrap === #
+def bootstrap_indices(rng, n, block_length, n_replicates):
+    """Replicates x n matrix of window indices built from randomly placed blocks of consecutive windows."""
+    block_length = min(block_length, n)
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, size=(n_replicates, n_blocks))
+    return (starts[:, :, None] + np.arange(block_length)).reshape(n_replicates, -1)[:, :n]
+
+
+def bootstrap_chunk(task):
+    (values_by_section, lengths), n_replicates, seed = task
+    rng = np.random.default_rng(seed)
+    means = np.full((n_replicates, len(values_by_section), values_by_section[0].shape[1]), np.nan)
+    for s, (values, block_length) in enumerate(zip(values_by_section, lengths)):
+        if len(values):
+            means[:, s] = np.nanmean(values[bootstrap_indices(rng, len(values), block_length, n_replicates)], axis=1)
+    return means
+
+
+def block_bootstrap(df, metrics, group_col="section", order_col="window_start", n_replicates=N_REPLICATES,
+                    block_length=BLOCK_LENGTH, seed=SEED, workers=N_WORKERS, chunk_size=CHUNK_SIZE):
+    """Section names and the replicates x sections x metrics array of bootstrapped section means."""
+    sections, values_by_section = section_values(df, metrics, group_col, order_col)
+    lengths = block_lengths(df, sections, block_length, group_col)
+    chunks = run_chunks(bootstrap_chunk, n_replicates, chunk_size, seed, (values_by_section, lengths), workers)
+    return sections, np.concatenate(chunks)
+
+
+# === Block label permutation === #
+def block_moments(values_by_section, lengths):
+    # Per block of consecutive windows: non-missing counts, sums and sums of squares, and its section
+    counts, sums, squares, labels = [], [], [], []
+    for s, (values, block_length) in enumerate(zip(values_by_section, lengths)):
+        for start in range(0, len(values), block_length):
+            block = values[start:start + block_length]
+            counts.append(np.sum(~np.isnan(block), axis=0))
+            sums.append(np.nansum(block, axis=0))
+            squares.append(np.nansum(block ** 2, axis=0))
+            labels.append(s)
+    return np.array(counts, dtype=float), np.array(sums), np.array(squares), np.array(labels)
+
+
+def f_statistics(counts, sums, squares, labels, n_groups):
+    """One-way ANOVA F per metric for each row of a replicates x blocks label matrix."""
+    labels = np.atleast_2d(labels)
+    n_total, total, total_sq = counts.sum(axis=0), sums.sum(axis=0), squares.sum(axis=0)
+    explained = np.zeros((len(labels), counts.shape[1]))
+    n_present = np.zeros((len(labels), counts.shape[1]))
+    for g in range(n_groups):
+        mask = (labels == g).astype(float)
+        group_n, group_sum = mask @ counts, mask @ sums
+        with np.errstate(divide="ignore", invalid="ignore"):
+            explained += np.where(group_n > 0, group_sum ** 2 / group_n, 0.0)
+        n_present += group_n > 0
+    ss_between = explained - total ** 2 / n_total
+    ss_within = total_sq - explained
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (ss_between / (n_present - 1)) / (ss_within / (n_total - n_present))
+
+
+def permutation_chunk(task):
+    (counts, sums, squares, labels, n_groups), n_replicates, seed = task
+    rng = np.random.default_rng(seed)
+    permuted = rng.permuted(np.tile(labels, (n_replicates, 1)), axis=1)
+    return f_statistics(counts, sums, squares, permuted, n_groups)
+
+
+def block_permutation_test(df, metrics, group_col="section", order_col="window_start", n_replicates=N_REPLICATES,
+                           block_length=BLOCK_LENGTH, seed=SEED, workers=N_WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    Observed ANOVA F per metric and its permutation p-value, shuffling section labels between
+    blocks of consecutive windows so the within-block autocorrelation is preserved. Replicates
+    with an undefined F are left out; the p-value is NaN where the observed F is (no variation).
+    """
+    sections, values_by_section = section_values(df, metrics, group_col, order_col)
+    lengths = block_lengths(df, sections, block_length, group_col)
+    counts, sums, squares, labels = block_moments(values_by_section, lengths)
+    observed = f_statistics(counts, sums, squares, labels, len(sections))[0]
+    args = (counts, sums, squares, labels, len(sections))
+    permuted = np.concatenate(run_chunks(permutation_chunk, n_replicates, chunk_size, seed, args, workers))
+    exceed = np.sum(permuted >= observed, axis=0)
+    valid = np.sum(~np.isnan(permuted), axis=0)
+    return observed, np.where(np.isnan(observed), np.nan, (exceed + 1) / (valid + 1))
+
+
+def resampling_table(df, metrics, group_col="section", order_col="window_start", n_replicates=N_REPLICATES,
+                     block_length=BLOCK_LENGTH, confidence=CONFIDENCE, seed=SEED, workers=N_WORKERS):
+    """
+    Tidy table per metric: the block permutation ANOVA ("Permutation", statistic = F), bootstrap
+    percentile intervals of every section mean ("Bootstrap mean") and of every difference of
+    section means ("Bootstrap diff", statistic = mean of group2 - mean of group1).
+    """
+    options = dict(group_col=group_col, order_col=order_col, n_replicates=n_replicates,
+                   block_length=block_length, seed=seed, workers=workers)
+    observed, p_values = block_permutation_test(df, metrics, **options)
+    sections, replicates = block_bootstrap(df, metrics, **options)
+    means = df.groupby(group_col)[metrics].mean().loc[sections].to_numpy()
+    tail = (1 - confidence) / 2 * 100
+
+    rows = []
+    for m, metric in enumerate(metrics):
+        rows.append({"metric": metric, "test": "Permutation", "group1": "-", "group2": "-",
+                     "statistic": observed[m], "p_value": p_values[m]})
+        lower, upper = np.nanpercentile(replicates[:, :, m], [tail, 100 - tail], axis=0)
+        for s, section in enumerate(sections):
+            rows.append({"metric": metric, "test": "Bootstrap mean", "group1": section, "group2": "-",
+                         "statistic": means[s, m], "lower": lower[s], "upper": upper[s]})
+        for a in range(len(sections)):
+            for b in range(a + 1, len(sections)):
+                diffs = replicates[:, b, m] - replicates[:, a, m]
+                lower, upper = np.nanpercentile(diffs, [tail, 100 - tail])
+                rows.append({"metric": metric, "test": "Bootstrap diff", "group1": sections[a], "group2": sections[b],
+                             "statistic": means[b, m] - means[a, m], "lower": lower, "upper": upper,
+                             "reject": bool(lower > 0 or upper < 0)})
+    return pd.DataFrame(rows, columns=["metric", "test", "group1", "group2", "statistic", "p_value",
+                                       "lower", "upper", "reject"])
@@ -1,10 +1,11 @@
 import pandas as pd
-import statsmodels.formula.api as smf
-import statsmodels.api as sm
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
 import matplotlib.pyplot as plt
 from matplotlib import rcParams
 
+from anova_engine import RESULTS_PATH, anova_tukey_table, format_p
+from figure_renderer import Figure, render_figures
+from resampling import RESULTS_PATH as RESAMPLING_PATH, resampling_table
+
 rcParams["font.family"] = "Times New Roman"
 
 df = pd.read_csv("style_metrics_sliding_window_full.csv")
@@ -17,33 +18,8 @@ metrics = [
 
 alpha = 0.05
 
-for metric in metrics:
-    print(f"Analyzing {metric}...")
-
-    groups = [group[metric].dropna() for _, group in df.groupby("section")]
-    if any(len(g.unique()) == 1 for g in groups):
-        print(f"Skipping {metric} due to no variation within at least one section.\n")
-        continue
-
-    formula = f"{metric} ~ C(section)"
-    model = smf.ols(formula, data=df).fit()
-    anova_results = sm.stats.anova_lm(model, typ=1)
-
-    f_val = anova_results["F"].iloc[0]
-    p_val = anova_results["PR(>F)"].iloc[0]
 
-    formatted_p_val = "< 1e-10" if p_val == 0 else f"{p_val:.2e}"
-    table_data = [["Test", "Group 1", "Group 2", "Mean Diff", "p-value", "Significant?"],
-                  ["ANOVA", "-", "-", f"{f_val:.3f}", formatted_p_val, "Yes" if p_val < alpha else "No"]]
-
-    if p_val < alpha:
-        tukey = pairwise_tukeyhsd(endog=df[metric], groups=df["section"], alpha=alpha)
-        for row in tukey._results_table.data[1:]:
-            group1, group2, meandiff, p_adj, lower, upper, reject = row
-            formatted_p_adj = "< 1e-10" if p_adj == 0 else f"{p_adj:.2e}"
-            table_data.append(["Tukey", group1, group2, f"{meandiff:.3f}", formatted_p_adj, "Yes" if reject else "No"])
-
-    # Plot table
+def plot_table(table_data, metric):
     fig, ax = plt.subplots(figsize=(10, 0.5 + 0.4 * len(table_data)))
     ax.axis("off")
     ax.set_title(f"ANOVA and Tukey HSD Results for {metric}", fontsize=14)
@@ -55,8 +31,49 @@ for metric in metrics:
     table.scale(1, 1.5)
 
     plt.tight_layout()
+    return fig
+
+
+# ANOVA and Tukey HSD for all metrics in one pass, saved for the table and report scripts
+results = anova_tukey_table(df, metrics, alpha=alpha)
+results.to_csv(RESULTS_PATH, index=False)
+print(f"Saved results: {RESULTS_PATH}")
+
+# Overlapping windows are autocorrelated: block permutation p-values and block bootstrap intervals
+resampled = resampling_table(df, metrics)
+resampled.to_csv(RESAMPLING_PATH, index=False)
+print(f"Saved results: {RESAMPLING_PATH}\n")
+
+figures = []
+
+for metric in metrics:
+    print(f"Analyzing {metric}...")
+
+    metric_results = results[results["metric"] == metric]
+    anova = metric_results[metric_results["test"] == "ANOVA"].iloc[0]
+    if anova["constant_group"]:
+        print(f"Skipping {metric} due to no variation within at least one section.\n")
+        continue
+
+    f_val = anova["statistic"]
+    p_val = anova["p_value"]
+
+    table_data = [["Test", "Group 1", "Group 2", "Mean Diff", "p-value", "Significant?"],
+                  ["ANOVA", "-", "-", f"{f_val:.3f}", format_p(p_val), "Yes" if p_val < alpha else "No"]]
+    permutation = resampled[(resampled["metric"] == metric) & (resampled["test"] == "Permutation")].iloc[0]
+    table_data.append(["Block permutation", "-", "-", f"{permutation['statistic']:.3f}",
+                       f"{permutation['p_value']:.2e}", "Yes" if permutation["p_value"] < alpha else "No"])
+
+    if p_val < alpha:
+        for _, row in metric_results[metric_results["test"] == "Tukey"].iterrows():
+            table_data.append(["Tukey", row["group1"], row["group2"], f"{row['statistic']:.3f}",
+                               format_p(row["p_value"]), "Yes" if row["reject"] else "No"])
+
+    # Plot table
     output_filename = f"{metric}_anova_tukey_table.png"
-    plt.savefig(output_filename, dpi=300)
-    plt.close()
-    print(f"Saved result table: {output_filename}\n")
+    figures.append(Figure(output_filename, plot_table, table_data, {"metric": metric}, {"dpi": 300}))
+    print(f"Queued result table: {output_filename}\n")
     print("-" * 50)
+
+# All tables are rendered in parallel; unchanged tables are skipped
+render_figures(figures)
@@ -0,0 +1,47 @@
+# snippet_index.py
+# Character offsets of the alpha tokens of each parsed section.
+# Built once from the (cached) section Docs; the text of a window given as (section, window_start)
+# in alpha-token units, as in the sliding-window tables, is then a slice of the section text.
+
+import numpy as np
+from spacy.attrs import IDX, IS_ALPHA, LENGTH
+
+
+class SnippetIndex:
+    """Section text plus the start/end character offset of every alpha token, per section."""
+
+    def __init__(self, section_docs):
+        self.texts = {}
+        self.starts = {}
+        self.ends = {}
+        for section, doc in section_docs.items():
+            values = doc.to_array([IS_ALPHA, IDX, LENGTH]).astype(np.int64)
+            alpha = values[:, 0].astype(bool)
+            self.texts[section] = doc.text
+            self.starts[section] = values[alpha, 1]
+            self.ends[section] = values[alpha, 1] + values[alpha, 2]
+
+    def spans(self, section, window_starts, window_size):
+        """(char_start, char_end) arrays of the windows of window_size alpha tokens at window_starts."""
+        starts, ends = self.starts[section], self.ends[section]
+        first = np.asarray(window_starts, dtype=np.int64)
+        last = np.minimum(first + window_size, len(ends)) - 1
+        return starts[first], ends[last]
+
+    def span(self, section, window_start, window_size):
+        char_start, char_end = self.spans(section, [window_start], window_size)
+        return int(char_start[0]), int(char_end[0])
+
+    def snippet(self, section, window_start, window_size):
+        char_start, char_end = self.span(section, window_start, window_size)
+        return self.texts[section][char_start:char_end]
+
+    def snippets(self, frame):
+        """Snippet of every (section, window_start, window_size) row of frame, in row order."""
+        out = [""] * len(frame)
+        for (section, window_size), rows in frame.groupby(["section", "window_size"], sort=False).indices.items():
+            char_starts, char_ends = self.spans(section, frame["window_start"].to_numpy()[rows], window_size)
+            text = self.texts[section]
+            for i, char_start, char_end in zip(rows, char_starts, char_ends):
+                out[i] = text[char_start:char_end]
+        return out
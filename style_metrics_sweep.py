@@ -0,0 +1,19 @@
+# style_metrics_sweep.py
+# Compute the sliding-window style metrics for several (window_size, step_size) configurations
+# in one run, reusing the same parsed sections and token arrays for every configuration.
+
+import sys
+
+from model_server import load_nlp
+from parse_service import load_section_docs
+from window_engine import SWEEP_CONFIGS, sweep_frame
+
+# Configurations can be given on the command line as window/step pairs, e.g. 500/100 200/50
+configs = [tuple(int(v) for v in arg.split("/")) for arg in sys.argv[1:]] or SWEEP_CONFIGS
+
+nlp = load_nlp()
+
+df = sweep_frame(load_section_docs(nlp), configs)
+df.to_csv("style_metrics_sweep.csv", index=False)
+print(f"Saved style_metrics_sweep.csv ({len(configs)} configurations)")
+print(df.groupby("config").size())
@@ -0,0 +1,73 @@
+# tei_reader.py
+# Streaming reader for the TEI-lite section files written by main.py.
+# Paragraphs are read with incremental XML parsing (iterparse), so entities such as &amp; and &lt;
+# are decoded, paragraphs spanning several lines stay whole, and finished elements are released
+# as soon as they are yielded, keeping memory use constant for arbitrarily large TEI files.
+
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+XML_ID = "{http://www.w3.org/XML/1998/namespace}id"
+
+Paragraph = namedtuple("Paragraph", ["section", "paragraph_id", "text"])
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_paragraphs(path):
+    """
+    Yield Paragraph(section, paragraph_id, text) for every non-empty <p> in a TEI file.
+    The section is the n (title) or xml:id of the enclosing <div type="section"> (the file name
+    without extension when it has neither); whitespace runs inside a paragraph collapse to single spaces.
+    """
+    default_section = os.path.splitext(os.path.basename(path))[0]
+    sections = []
+    stack = []
+    paragraph_id = 0
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        name = local_name(elem.tag)
+        if event == "start":
+            stack.append(elem)
+            if name == "div":
+                sections.append(elem.get("n") or elem.get(XML_ID) or (sections[-1] if sections else default_section))
+            continue
+
+        stack.pop()
+        if name == "p":
+            text = " ".join("".join(elem.itertext()).split())
+            if text:
+                yield Paragraph(sections[-1] if sections else default_section, paragraph_id, text)
+                paragraph_id += 1
+            # Detach the finished paragraph so the tree never grows
+            if stack:
+                stack[-1].remove(elem)
+        elif name == "div":
+            sections.pop()
+
+
+def read_paragraphs(path):
+    return [paragraph.text for paragraph in iter_paragraphs(path)]
+
+
+def section_text(path):
+    return " ".join(read_paragraphs(path))
+
+
+def section_files(corpus_dir):
+    """
+    (section, path) pairs for the TEI files of a corpus. Files directly in corpus_dir keep their
+    plain name as section; works ingested from a manifest live in corpus_dir/<work id>/ and are
+    keyed "<work id>/<section>", so sections of different works never collide.
+    """
+    files = []
+    for filename in os.listdir(corpus_dir):
+        path = os.path.join(corpus_dir, filename)
+        if filename.endswith(".xml"):
+            files.append((filename.replace(".xml", ""), path))
+        elif os.path.isdir(path):
+            files.extend((f"{filename}/{nested.replace('.xml', '')}", os.path.join(path, nested))
+                         for nested in os.listdir(path) if nested.endswith(".xml"))
+    return files
@@ -1,44 +1,29 @@
 # text_mining_analysis.py
 # Performs Sentiment Analysis and Topic Modeling on Faulkner's narrative sections
 
-import json
-import os
 from collections import defaultdict
 
 import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
 import seaborn as sns
-from fpdf import FPDF
-from gensim import corpora, models
-from nltk import download
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from scipy.spatial.distance import jensenshannon
 
-# Ensure VADER lexicon is available
-download('vader_lexicon')
-sid = SentimentIntensityAnalyzer()
+from divergence import adjacent_js
+from model_server import sliding_sentiment
+from token_store import TokenStore
+from topic_model import NUM_TOPICS, fit_topic_model, infer_topic_matrix
 
 
-# === Load Tokens from JSONL === #
-def get_tokens_from_jsonl(path):
-    token_list = []
-    with open(path, encoding='utf-8') as f:
-        for line in f:
-            entry = json.loads(line)
-            token_list.extend(entry['tokens'])
-    return token_list
+# === Load Tokens from the columnar token store === #
+def get_tokens_from_store(store, section):
+    keep = store.section_column('keep', section)
+    return store.strings('word', store.section_column('word', section)[keep]).tolist()
 
 
 # === Sentiment: Sliding Window === #
 def windowed_sentiment(token_list, window_size=500, overlap=100):
-    scores = []
-    for win_idx in range(0, len(token_list) - window_size + 1, window_size - overlap):
-        window = token_list[win_idx:win_idx + window_size]
-        text = ' '.join(window)
-        score = sid.polarity_scores(text)
-        scores.append(score['compound'])
-    return scores
+    # Same compound scores as sid.polarity_scores(' '.join(window)), computed incrementally
+    # (by the model server when it is running)
+    return sliding_sentiment(token_list, window_size, window_size - overlap)
 
 
 # === Topic Modeling: Token Windows === #
@@ -56,20 +41,19 @@ topic_windows = []
 section_labels = []
 section_window_map = defaultdict(list)
 
-for file in os.listdir('processed'):
-    if file.endswith('.jsonl'):
-        section = file.replace('.jsonl', '')
-        token_list = get_tokens_from_jsonl(os.path.join('processed', file))
+store = TokenStore()
+for section in store.sections:
+    token_list = get_tokens_from_store(store, section)
 
-        # Sentiment arcs
-        arc = windowed_sentiment(token_list)
-        sentiment_results[section] = arc
+    # Sentiment arcs
+    arc = windowed_sentiment(token_list)
+    sentiment_results[section] = arc
 
-        # Topic modeling windows
-        win_list = build_token_windows(token_list)
-        topic_windows.extend(win_list)
-        section_labels.extend([section] * len(win_list))
-        section_window_map[section].extend(win_list)
+    # Topic modeling windows
+    win_list = build_token_windows(token_list)
+    topic_windows.extend(win_list)
+    section_labels.extend([section] * len(win_list))
+    section_window_map[section].extend(win_list)
 
 # === Save Sentiment Arc Plot === #
 plt.figure(figsize=(10, 6))
@@ -83,19 +67,15 @@ plt.tight_layout()
 plt.savefig("sentiment_arcs.png")
 print("Saved: sentiment_arcs.png")
 
-# === Train LDA Model === #
-dictionary = corpora.Dictionary(topic_windows)
-corpus = [dictionary.doc2bow(win) for win in topic_windows]
-lda_model = models.LdaModel(corpus=corpus, id2word=dictionary, num_topics=5, passes=10, random_state=42)
+# === Train LDA Model (loaded from disk when the windows are unchanged) === #
+topic_model = fit_topic_model(topic_windows, section_labels)
+lda_model = topic_model.lda
+corpus = topic_model.corpus()
 
-# === Extract Topic Distributions === #
-topic_distributions = [lda_model.get_document_topics(doc, minimum_probability=0) for doc in corpus]
-topic_matrix = np.zeros((len(topic_distributions), 5))
-for row_index, topic_dist in enumerate(topic_distributions):
-    for topic_id, prob in topic_dist:
-        topic_matrix[row_index][topic_id] = prob
+# === Extract Topic Distributions (batched inference over the whole corpus) === #
+topic_matrix = infer_topic_matrix(lda_model, corpus)
 
-df_topic = pd.DataFrame(topic_matrix, columns=[f'Topic_{i}' for i in range(5)])
+df_topic = pd.DataFrame(topic_matrix, columns=[f'Topic_{i}' for i in range(NUM_TOPICS)])
 df_topic['section'] = section_labels
 df_topic.to_csv('topic_windows.csv', index=False)
 print("Saved: topic_windows.csv")
@@ -106,14 +86,11 @@ plt.figure(figsize=(8, 4))
 sns.heatmap(heatmap_df, annot=True, cmap="YlGnBu")
 plt.title("Average Topic Distribution per Section")
 plt.tight_layout()
-plt.savefig("topic_heatmap.png")
-print("Saved: topic_heatmap.png")
+plt.savefig("summary_topic_heatmap.png")
+print("Saved: summary_topic_heatmap.png")
 
-# === Jensen-Shannon divergence (topic shift rate) === #
-shift_scores = []
-for i in range(1, len(topic_matrix)):
-    js = jensenshannon(topic_matrix[i - 1], topic_matrix[i])
-    shift_scores.append(js)
+# === Jensen-Shannon divergence (topic shift rate, NaN across section boundaries) === #
+shift_scores = adjacent_js(topic_matrix, section_labels)
 
 plt.figure(figsize=(10, 4))
 plt.plot(shift_scores)
@@ -121,47 +98,15 @@ plt.title("Topic Shift Rate (Jensen-Shannon Divergence)")
 plt.xlabel("Window Index")
 plt.ylabel("JS Divergence")
 plt.tight_layout()
-plt.savefig("topic_shift_curve.png")
-print("Saved: topic_shift_curve.png")
+plt.savefig("summary_topic_shift_curve.png")
+print("Saved: summary_topic_shift_curve.png")
 
 # === Top keywords per topic === #
 with open("topic_keywords.txt", "w", encoding="utf-8") as f:
-    for i in range(5):
+    for i in range(NUM_TOPICS):
         f.write(f"Topic {i}:\n")
         keywords = lda_model.show_topic(i, topn=10)
         for word, weight in keywords:
             f.write(f"  {word:10s} {weight:.4f}\n")
         f.write("\n")
 print("Saved: topic_keywords.txt")
-
-# === Poster/Report Export (PDF Summary) === #
-pdf = FPDF()
-pdf.set_auto_page_break(auto=True, margin=15)
-pdf.add_page()
-
-pdf.set_font("Times", 'B', 14)
-pdf.cell(0, 10, "Faulkner Text-Mining Summary Report", ln=True, align='C')
-
-pdf.set_font("Times", '', 12)
-pdf.multi_cell(0, 10,
-               "This report summarizes the sentiment and topic modeling analysis for each narrative section in "
-               "William Faulkner's 'The Sound and the Fury'. It includes emotional arcs, average topic distributions, "
-               "and topic transitions.")
-
-pdf.ln(5)
-pdf.image("sentiment_arcs.png", w=180)
-pdf.ln(5)
-pdf.image("topic_heatmap.png", w=180)
-pdf.ln(5)
-pdf.image("topic_shift_curve.png", w=180)
-
-pdf.add_page()
-pdf.set_font("Times", 'B', 12)
-pdf.cell(0, 10, "Top 10 Keywords per Topic:", ln=True)
-pdf.set_font("Times", '', 10)
-with open("topic_keywords.txt", encoding="utf-8") as f:
-    for line in f:
-        pdf.multi_cell(0, 5, line.strip())
-
-pdf.output("faulkner_analysis_summary.pdf")
-print("Saved: faulkner_analysis_summary.pdf")
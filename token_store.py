@@ -0,0 +1,136 @@
+# token_store.py
+# Columnar on-disk token store written by Text Preprocessing.py.
+# Every token attribute is one flat binary array (opened as a read-only np.memmap), string
+# attributes are stored as integer ids into per-column vocabulary tables, and sentence/section
+# offset arrays delimit the rows, so downstream stages read only the columns and ranges they need.
+
+import json
+import os
+
+import numpy as np
+
+STORE_DIR = os.path.join("processed", "tokens")
+
+STRING_COLUMNS = ["word", "lemma", "pos", "tag", "dep"]
+TOKEN_COLUMNS = {
+    "word": "uint32", "lemma": "uint32", "pos": "uint32", "tag": "uint32", "dep": "uint32",
+    "head": "int32",  # offset of the head from the token
+    "is_alpha": "bool",
+    "keep": "bool",  # passed the stopword and lemma-frequency filter
+}
+SENTENCE_COLUMNS = {"sentence_id": "int32", "text_offsets": "int64"}
+
+
+class TokenStoreWriter:
+    """Streams sentences to the column files; offsets, vocabularies and metadata are written on close()."""
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.files = {name: open(os.path.join(path, f"{name}.bin"), "wb") for name in TOKEN_COLUMNS}
+        self.files["sentence_id"] = open(os.path.join(path, "sentence_id.bin"), "wb")
+        self.text_file = open(os.path.join(path, "sentence_text.bin"), "wb")
+        self.vocabs = {name: {} for name in STRING_COLUMNS}
+        self.sections = []
+        self.section_offsets = [0]
+        self.sentence_offsets = [0]
+        self.text_offsets = [0]
+
+    def encode(self, name, values):
+        vocab = self.vocabs[name]
+        return [vocab.setdefault(value, len(vocab)) for value in values]
+
+    def add_sentence(self, section, sentence_id, text, columns):
+        """columns maps every token column name to a list of per-token values for this sentence."""
+        if not self.sections or self.sections[-1] != section:
+            self.sections.append(section)
+            self.section_offsets.append(self.section_offsets[-1])
+        for name, dtype in TOKEN_COLUMNS.items():
+            values = self.encode(name, columns[name]) if name in self.vocabs else columns[name]
+            np.asarray(values, dtype=dtype).tofile(self.files[name])
+        np.asarray([sentence_id], dtype="int32").tofile(self.files["sentence_id"])
+        encoded = text.encode("utf-8")
+        self.text_file.write(encoded)
+
+        self.section_offsets[-1] += 1
+        self.sentence_offsets.append(self.sentence_offsets[-1] + len(columns["word"]))
+        self.text_offsets.append(self.text_offsets[-1] + len(encoded))
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.text_file.close()
+        np.asarray(self.sentence_offsets, dtype="int64").tofile(os.path.join(self.path, "sentence_offsets.bin"))
+        np.asarray(self.section_offsets, dtype="int64").tofile(os.path.join(self.path, "section_offsets.bin"))
+        np.asarray(self.text_offsets, dtype="int64").tofile(os.path.join(self.path, "text_offsets.bin"))
+        for name, vocab in self.vocabs.items():
+            with open(os.path.join(self.path, f"vocab_{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(list(vocab), f)
+        meta = {
+            "columns": TOKEN_COLUMNS,
+            "sections": self.sections,
+            "n_tokens": self.sentence_offsets[-1],
+            "n_sentences": len(self.sentence_offsets) - 1,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+
+class TokenStore:
+    """Read-only, zero-copy view of a token store; columns are memory-mapped on first use."""
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.sections = self.meta["sections"]
+        self.sentence_offsets = self.map_file("sentence_offsets", "int64")
+        self.section_offsets = self.map_file("section_offsets", "int64")
+        self.columns = {}
+        self.vocabs = {}
+
+    def map_file(self, name, dtype):
+        file_path = os.path.join(self.path, f"{name}.bin")
+        if os.path.getsize(file_path) == 0:
+            return np.zeros(0, dtype=dtype)  # np.memmap cannot map empty files
+        return np.memmap(file_path, dtype=dtype, mode="r")
+
+    def column(self, name):
+        if name not in self.columns:
+            dtype = TOKEN_COLUMNS.get(name) or SENTENCE_COLUMNS[name]
+            self.columns[name] = self.map_file(name, dtype)
+        return self.columns[name]
+
+    def vocab(self, name):
+        if name not in self.vocabs:
+            with open(os.path.join(self.path, f"vocab_{name}.json"), encoding="utf-8") as f:
+                self.vocabs[name] = np.array(json.load(f), dtype=object)
+        return self.vocabs[name]
+
+    def vocab_id(self, name, value):
+        # Id of a string in a column's vocabulary, or -1 when it never occurs
+        matches = np.flatnonzero(self.vocab(name) == value)
+        return int(matches[0]) if len(matches) else -1
+
+    def strings(self, name, ids):
+        return self.vocab(name)[np.asarray(ids)]
+
+    def sentence_range(self, section):
+        i = self.sections.index(section)
+        return int(self.section_offsets[i]), int(self.section_offsets[i + 1])
+
+    def token_range(self, section):
+        first, last = self.sentence_range(section)
+        return int(self.sentence_offsets[first]), int(self.sentence_offsets[last])
+
+    def section_column(self, name, section):
+        start, end = self.token_range(section)
+        return self.column(name)[start:end]
+
+    def sentence_texts(self, section):
+        first, last = self.sentence_range(section)
+        offsets = self.map_file("text_offsets", "int64")[first:last + 1]
+        with open(os.path.join(self.path, "sentence_text.bin"), "rb") as f:
+            f.seek(int(offsets[0]))
+            blob = f.read(int(offsets[-1] - offsets[0]))
+        return [blob[a - offsets[0]:b - offsets[0]].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
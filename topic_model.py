@@ -0,0 +1,195 @@
+# topic_model.py
+# Persistent LDA training for the token windows of text_mining_analysis.py.
+# The window corpus is serialized once to Matrix Market format and streamed from disk; every
+# trained model is saved next to its dictionary under a hash of the corpus and
+# the training parameters, so re-running the analysis on an unchanged corpus loads the model
+# instead of retraining it. When the corpus only gained new sections (e.g. a new work from the
+# manifest), the previous model is updated online with the new windows. Models unused for
+# MAX_MODEL_AGE, or beyond the MAX_MODELS most recently used, are removed.
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+from gensim import corpora, models
+from gensim.utils import grouper
+
+MODEL_DIR = os.path.join("processed", "lda")
+NUM_TOPICS = 5
+PASSES = 10
+RANDOM_STATE = 42
+# One worker (the default) trains a single-process LdaModel, which random_state makes reproducible.
+# With more workers (LDA_WORKERS) LdaMulticore is faster, but chunks reach the workers in varying
+# order, so its results change from run to run (the worker count is part of the model key)
+WORKERS = int(os.environ.get("LDA_WORKERS", 1))
+MAX_MODELS = 10
+MAX_MODEL_AGE = 30 * 24 * 3600  # seconds since a model was last loaded or saved
+INFERENCE_CHUNK = 2000
+MIN_PROBABILITY = 1e-8  # get_document_topics never reports probabilities below this
+
+
+def window_hash(windows):
+    digest = hashlib.sha256()
+    for window in windows:
+        digest.update(" ".join(window).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def group_hashes(windows, labels):
+    # One hash per section, so added, changed and removed sections can be told apart
+    groups = {}
+    for window, label in zip(windows, labels):
+        groups.setdefault(label, []).append(window)
+    return {label: window_hash(group) for label, group in groups.items()}
+
+
+def model_key(groups, params):
+    payload = json.dumps({"groups": groups, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class TopicModel:
+    """A trained LDA model with its dictionary and the Matrix Market corpus it was trained on."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lda = models.LdaModel.load(os.path.join(path, "lda.model"))
+        self.dictionary = corpora.Dictionary.load(os.path.join(path, "dictionary.dict"))
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+    @property
+    def num_topics(self):
+        return self.lda.num_topics
+
+    def corpus(self):
+        return corpora.MmCorpus(os.path.join(self.path, "corpus.mm"))
+
+    def infer(self, windows, chunksize=INFERENCE_CHUNK):
+        """Topic mixtures of new token windows (other editions or works), without retraining."""
+        return infer_topic_matrix(self.lda, (self.dictionary.doc2bow(window) for window in windows), chunksize)
+
+
+def infer_topic_matrix(lda, corpus, chunksize=INFERENCE_CHUNK):
+    """
+    Windows x topics matrix of a bag-of-words corpus, inferred chunk by chunk in single
+    lda.inference calls. Rows match get_document_topics(doc, minimum_probability=0) up to the
+    variational tolerance: normalized gamma, with probabilities below MIN_PROBABILITY set to 0.
+    """
+    rows = []
+    for chunk in grouper(corpus, chunksize):
+        gamma, _ = lda.inference(chunk)
+        theta = gamma / gamma.sum(axis=1, keepdims=True)
+        theta[theta < MIN_PROBABILITY] = 0.0
+        rows.append(theta)
+    return np.vstack(rows) if rows else np.zeros((0, lda.num_topics))
+
+
+def load_topic_model(name=None, model_dir=MODEL_DIR):
+    # A saved model by key (directory name), or the most recently saved one
+    if name is None:
+        saved = [entry for entry in os.listdir(model_dir) if os.path.exists(os.path.join(model_dir, entry, "meta.json"))]
+        if not saved:
+            raise FileNotFoundError(f"No saved topic model in {model_dir}")
+        name = max(saved, key=lambda entry: os.path.getmtime(os.path.join(model_dir, entry, "meta.json")))
+    return TopicModel(os.path.join(model_dir, name))
+
+
+def serialize_corpus(path, dictionary, windows):
+    # Streams the bag-of-words vectors to disk; the corpus is never held in memory as a whole
+    corpora.MmCorpus.serialize(os.path.join(path, "corpus.mm"), (dictionary.doc2bow(window) for window in windows))
+    return corpora.MmCorpus(os.path.join(path, "corpus.mm"))
+
+
+def find_base_model(groups, params, model_dir=MODEL_DIR):
+    # Latest model trained with the same parameters on a subset of the current sections
+    candidates = []
+    if not os.path.isdir(model_dir):
+        return None
+    for name in os.listdir(model_dir):
+        meta_path = os.path.join(model_dir, name, "meta.json")
+        if not os.path.exists(meta_path):
+            continue
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        old_groups = meta["groups"]
+        if meta["params"] == params and old_groups.items() <= groups.items() and len(old_groups) < len(groups):
+            candidates.append((len(old_groups), os.path.getmtime(meta_path), name))
+    return os.path.join(model_dir, max(candidates)[2]) if candidates else None
+
+
+def save_model(path, lda, dictionary, groups, params, updated_from=None):
+    lda.save(os.path.join(path, "lda.model"))
+    dictionary.save(os.path.join(path, "dictionary.dict"))
+    meta = {"groups": groups, "params": params, "updated_from": updated_from}
+    # meta.json is written last: a directory without it is an interrupted run and gets retrained
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def evict_models(model_dir=MODEL_DIR, max_models=MAX_MODELS, max_age=MAX_MODEL_AGE, keep=None):
+    # Models are ordered by the mtime of meta.json (touched on every load); directories without it
+    # are interrupted runs and count by their own mtime
+    if not os.path.isdir(model_dir):
+        return
+    now = time.time()
+    entries = []
+    for name in os.listdir(model_dir):
+        path = os.path.join(model_dir, name)
+        meta_path = os.path.join(path, "meta.json")
+        try:
+            mtime = os.path.getmtime(meta_path if os.path.exists(meta_path) else path)
+        except FileNotFoundError:
+            continue
+        entries.append((mtime, path))
+    entries.sort(reverse=True)
+    for rank, (mtime, path) in enumerate(entries):
+        if path != keep and (rank >= max_models or now - mtime > max_age):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def fit_topic_model(windows, labels, num_topics=NUM_TOPICS, passes=PASSES, random_state=RANDOM_STATE,
+                    workers=WORKERS, model_dir=MODEL_DIR):
+    """
+    Return the TopicModel for these token windows (labels gives the section of each window).
+    Loads the saved model when the corpus and parameters are unchanged, updates the previous model
+    online when only new sections were added, and trains a new one otherwise.
+    """
+    params = {"num_topics": num_topics, "passes": passes, "random_state": random_state, "workers": workers}
+    groups = group_hashes(windows, labels)
+    path = os.path.join(model_dir, model_key(groups, params))
+    if os.path.exists(os.path.join(path, "meta.json")):
+        os.utime(os.path.join(path, "meta.json"))  # mark as recently used
+        evict_models(model_dir, keep=path)
+        print(f"Loaded topic model: {path}")
+        return TopicModel(path)
+
+    os.makedirs(path, exist_ok=True)
+    base_path = find_base_model(groups, params, model_dir)
+    if base_path:
+        # Online update: the dictionary stays fixed, words unseen by the base model are ignored
+        base = TopicModel(base_path)
+        lda, dictionary = base.lda, base.dictionary
+        serialize_corpus(path, dictionary, windows)
+        new_windows = [window for window, label in zip(windows, labels) if label not in base.meta["groups"]]
+        lda.update([dictionary.doc2bow(window) for window in new_windows])
+        print(f"Updated topic model {base_path} with {len(new_windows)} new windows")
+    else:
+        dictionary = corpora.Dictionary(windows)
+        corpus = serialize_corpus(path, dictionary, windows)
+        if workers > 1:
+            lda = models.LdaMulticore(corpus=corpus, id2word=dictionary, num_topics=num_topics, passes=passes,
+                                      random_state=random_state, workers=workers)
+        else:
+            lda = models.LdaModel(corpus=corpus, id2word=dictionary, num_topics=num_topics, passes=passes,
+                                  random_state=random_state)
+        print(f"Trained topic model on {len(windows)} windows")
+
+    save_model(path, lda, dictionary, groups, params, updated_from=base_path)
+    evict_models(model_dir, keep=path)
+    print(f"Saved topic model: {path}")
+    return TopicModel(path)
@@ -0,0 +1,114 @@
+# vader_windows.py
+# Incremental VADER compound scores for sliding token windows.
+# Each token's valence is computed once per section with VADER's own rules (sentiment_valence:
+# boosters, negations, idioms over the three preceding and two following words); the compound
+# score of every window is then assembled from those values while the window slides, so a section
+# costs O(tokens) instead of re-tokenizing and re-scoring every overlapping window.
+# See exam_vader_windows.py for the comparison against sid.polarity_scores.
+
+import math
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+
+VADER_ALPHA = 15  # normalization constant of the compound score
+
+
+def prefix_count(flags):
+    sums = np.zeros(len(flags) + 1, dtype=np.int64)
+    np.cumsum(flags, out=sums[1:])
+    return sums
+
+
+def token_valence(sid, words, p, lo, hi, is_cap_diff):
+    """
+    Valence VADER gives words[p] when the analysed text is words[lo:hi]: only words[p - 3: p + 3]
+    are ever looked at, so that slice (clipped to the text) is passed as context.
+    """
+    word = words[p]
+    if word.lower() not in sid.lexicon or word.lower() in sid.constants.BOOSTER_DICT:
+        return 0.0
+    if word.lower() == "kind" and p + 1 < hi and words[p + 1].lower() == "of":
+        return 0.0
+    first = max(lo, p - 3)
+    context = SimpleNamespace(words_and_emoticons=words[first:min(hi, p + 3)], is_cap_diff=is_cap_diff)
+    return sid.sentiment_valence(0, context, word, p - first, [])[-1]
+
+
+def compound(sum_s):
+    # The running totals may leave rounding residue where the exact sum is 0
+    return round(sum_s / math.sqrt(sum_s * sum_s + VADER_ALPHA), 4) if abs(sum_s) > 1e-9 else 0.0
+
+
+def sliding_compound(sid, tokens, window_size, step_size):
+    """
+    sid.polarity_scores(' '.join(window))['compound'] for every window of tokens.
+    Windows containing a non-alpha token (punctuation rules) or 'but' (which rescales the whole
+    window around its position) are scored with polarity_scores itself.
+    """
+    starts = np.arange(0, len(tokens) - window_size + 1, step_size)
+    if not len(starts):
+        return []
+    # VADER drops one-character words; the remaining words keep their order
+    words = [token for token in tokens if len(token) > 1]
+    kept = prefix_count([len(token) > 1 for token in tokens])
+    plain = prefix_count([token.isalpha() for token in tokens])
+    upper = prefix_count([word.isupper() for word in words])
+    but = prefix_count([word.lower() == "but" for word in words])
+
+    # Valence of every word in full context, with and without the ALL-CAPS differential
+    # (the differential only matters when the word or a preceding modifier is in capitals)
+    valence = [[token_valence(sid, words, p, 0, len(words), False) for p in range(len(words))]]
+    valence.append([token_valence(sid, words, p, 0, len(words), True)
+                    if any(word.isupper() for word in words[max(0, p - 3):p + 1]) else valence[0][p]
+                    for p in range(len(words))])
+
+    # polarity_scores scores every occurrence of a word with the context of its first occurrence
+    # in the text, so each type contributes count * valence(first position in the window)
+    type_ids = {}
+    types = [type_ids.setdefault(word, len(type_ids)) for word in words]
+    positions = [deque() for _ in type_ids]
+    totals = [0.0, 0.0]
+
+    def add(p):
+        queue = positions[types[p]]
+        first = queue[0] if queue else p
+        for cap in (0, 1):
+            totals[cap] += valence[cap][first]
+        queue.append(p)
+
+    def remove(p):
+        queue = positions[types[p]]
+        count = len(queue)
+        queue.popleft()
+        for cap in (0, 1):
+            totals[cap] -= count * valence[cap][p]
+            if queue:
+                totals[cap] += (count - 1) * valence[cap][queue[0]]
+
+    scores = []
+    lo = hi = 0
+    for start in starts:
+        a, b = int(kept[start]), int(kept[start + window_size])
+        while lo < min(a, hi):
+            remove(lo)
+            lo += 1
+        lo, hi = a, max(hi, a)
+        while hi < b:
+            add(hi)
+            hi += 1
+
+        if plain[start + window_size] - plain[start] < window_size or but[b] > but[a]:
+            scores.append(sid.polarity_scores(" ".join(tokens[start:start + window_size]))["compound"])
+            continue
+        n_upper = upper[b] - upper[a]
+        cap = int(0 < (b - a) - n_upper < b - a)
+        sum_s = totals[cap]
+        # Words near the window edges see a clipped context
+        for p in set(range(a, min(a + 3, b))) | set(range(max(b - 2, a), b)):
+            queue = positions[types[p]]
+            if queue[0] == p:
+                sum_s += len(queue) * (token_valence(sid, words, p, a, b, bool(cap)) - valence[cap][p])
+        scores.append(compound(sum_s))
+    return scores
@@ -0,0 +1,68 @@
+# window_engine.py
+# Parse-once sliding windows for the style metrics.
+# Each section is parsed a single time; a window is a range of alpha tokens of that Doc and its
+# metrics are read from the full-context parse instead of re-parsing the window on its own.
+# Count-based metrics come from the prefix-sum kernels in window_kernels.py and lexical
+# diversity (TTR, MTLD, MATTR, HD-D) from the streaming counters in diversity_metrics.py.
+
+import pandas as pd
+
+from diversity_metrics import diversity_metric_arrays, encode_tokens
+from window_kernels import section_arrays, window_metric_arrays
+
+# How sentences that cross a window boundary enter the sentence-level metrics (MSL,
+# AvgClauseLength, SubordinationIndex):
+#   "clip" - the part of the sentence inside the window counts as a sentence
+#   "drop" - edge sentences extending outside the window are ignored (unless nothing else is left)
+SENTENCE_POLICY = "clip"
+
+METRIC_COLUMNS = [
+    "MSL", "SCR", "PassiveAuxRatio", "PastParticipleRatio", "TTR", "AWL", "MTLD",
+    "NounRatio", "VerbRatio", "AdjRatio", "AdvRatio",
+    "AvgClauseLength", "MeanDependencyDistance", "SubordinationIndex", "MATTR", "HDD"
+]
+
+# (window_size, step_size) pairs computed by the parameter sweep
+SWEEP_CONFIGS = [(500, 100), (200, 50), (200, 100)]
+
+
+def section_texts(doc):
+    return [token.text for token in doc if token.is_alpha]
+
+
+def prepare_section(doc):
+    # Token arrays for the count kernels and integer type ids for the diversity counters
+    ids, n_types = encode_tokens(section_texts(doc))
+    return section_arrays(doc), ids, n_types
+
+
+def window_frame(section, prepared, window_size, step_size, policy=SENTENCE_POLICY):
+    arrays, ids, n_types = prepared
+    starts, metrics = window_metric_arrays(arrays, window_size, step_size, policy)
+    metrics.update(diversity_metric_arrays(ids, n_types, window_size, step_size))
+
+    # Every table carries its window geometry, so readers never assume which script wrote it
+    frame = pd.DataFrame({"window_size": window_size, "step_size": step_size, "section": section,
+                          "window_start": starts})
+    for column in METRIC_COLUMNS:
+        frame[column] = metrics.get(column, [])
+    return frame
+
+
+def sliding_window_frame(section, doc, window_size, step_size, policy=SENTENCE_POLICY):
+    return window_frame(section, prepare_section(doc), window_size, step_size, policy)
+
+
+def sweep_frame(section_docs, configs=SWEEP_CONFIGS, policy=SENTENCE_POLICY):
+    """
+    Metrics for several (window_size, step_size) configurations in one table keyed by config.
+    Token arrays and type ids are built once per section and shared by every configuration.
+    """
+    frames = []
+    for section, doc in section_docs.items():
+        prepared = prepare_section(doc)
+        for window_size, step_size in configs:
+            frame = window_frame(section, prepared, window_size, step_size, policy)
+            frame.insert(0, "config", f"{window_size}_{step_size}")
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
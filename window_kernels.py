@@ -0,0 +1,134 @@
+# window_kernels.py
+# Prefix-sum kernels for the count-based sliding-window metrics.
+# A parsed section is turned into NumPy arrays over its alpha tokens once; the metric of every
+# window is then a difference of two cumulative sums, so all windows cost O(tokens) together.
+
+import numpy as np
+from spacy.attrs import DEP, HEAD, IS_ALPHA, LENGTH, POS, TAG
+from spacy.symbols import ADJ, ADV, NOUN, VERB
+
+
+def section_arrays(doc):
+    """
+    Integer/boolean arrays over the alpha tokens of a parsed section:
+    POS id, tag id, dep id, POS id of the head, head distance, word length and a dense sentence id
+    (sentences without alpha tokens are skipped), plus the first/end alpha index of each sentence.
+    """
+    strings = doc.vocab.strings
+    values = doc.to_array([POS, TAG, DEP, HEAD, IS_ALPHA, LENGTH])
+    heads = values[:, 3].astype(np.int64)  # relative offsets, stored as wrapped uint64
+    positions = np.flatnonzero(values[:, 4])
+
+    sent_starts = np.array([sent.start for sent in doc.sents], dtype=np.int64)
+    sent_ids = np.searchsorted(sent_starts, positions, side="right") - 1
+    new_sent = np.ones(len(positions), dtype=bool)
+    new_sent[1:] = sent_ids[1:] != sent_ids[:-1]
+    sent_first = np.flatnonzero(new_sent)
+
+    return {
+        "pos": values[positions, 0],
+        "tag": values[positions, 1],
+        "dep": values[positions, 2],
+        "head_pos": values[positions + heads[positions], 0],
+        "head_dist": np.abs(heads[positions]),
+        "word_len": values[positions, 5].astype(np.int64),
+        "sent": np.cumsum(new_sent) - 1,
+        "sent_first": sent_first,
+        "sent_end": np.append(sent_first[1:], len(positions)),
+        "mark": strings.add("mark"),
+        "auxpass": strings.add("auxpass"),
+        "vbn": strings.add("VBN"),
+    }
+
+
+def window_bounds(n_tokens, window_size, step_size):
+    starts = np.arange(0, n_tokens - window_size + 1, step_size, dtype=np.int64)
+    return starts, starts + window_size
+
+
+def prefix(values):
+    sums = np.zeros(len(values) + 1)
+    np.cumsum(values, out=sums[1:])
+    return sums
+
+
+def window_sum(values, starts, ends):
+    sums = prefix(values)
+    return sums[ends] - sums[starts]
+
+
+def ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def sentence_counts(arrays, starts, ends, policy):
+    """
+    Number of sentences, their total alpha length and how many contain a 'mark' token, per window.
+    "clip" counts the in-window part of edge sentences; "drop" ignores edge sentences that extend
+    outside the window and falls back to "clip" when no sentence would be left.
+    """
+    sent, first, end = arrays["sent"], arrays["sent_first"], arrays["sent_end"]
+    is_mark = arrays["dep"] == arrays["mark"]
+    s0, s1 = sent[starts], sent[ends - 1]
+    single = s0 == s1
+
+    # Marks inside the clipped head/tail sentence and inside the fully contained interior sentences
+    head_end = np.minimum(end[s0], ends)
+    tail_start = np.where(single, ends, first[s1])
+    head_marked = window_sum(is_mark, starts, head_end) > 0
+    tail_marked = (window_sum(is_mark, tail_start, ends) > 0) & ~single
+    sent_marked = prefix(np.add.reduceat(is_mark, first) > 0) if len(first) else np.zeros(1)
+    interior_marked = np.where(single, 0, sent_marked[s1] - sent_marked[np.minimum(s0 + 1, s1)])
+
+    clip_n = s1 - s0 + 1
+    clip_len = ends - starts
+    clip_marked = head_marked + interior_marked + tail_marked
+    if policy == "clip":
+        return clip_n, clip_len, clip_marked
+
+    keep_head = (first[s0] >= starts) & ~(single & (end[s1] > ends))
+    keep_tail = ~single & (end[s1] <= ends)
+    head_len = head_end - starts
+    tail_len = ends - tail_start
+    interior_len = clip_len - head_len - tail_len
+    drop_n = np.maximum(s1 - s0 - 1, 0) + keep_head + keep_tail
+    drop_len = interior_len + keep_head * head_len + keep_tail * tail_len
+    drop_marked = interior_marked + keep_head * head_marked + keep_tail * tail_marked
+    use_clip = drop_n == 0
+    return (np.where(use_clip, clip_n, drop_n),
+            np.where(use_clip, clip_len, drop_len),
+            np.where(use_clip, clip_marked, drop_marked))
+
+
+def window_metric_arrays(arrays, window_size, step_size, policy="clip"):
+    """Every count-based metric for every window of one section, as arrays aligned with window starts."""
+    starts, ends = window_bounds(len(arrays["pos"]), window_size, step_size)
+    if not len(starts):
+        return starts, {}
+    pos, dep = arrays["pos"], arrays["dep"]
+
+    verbs = window_sum(pos == VERB, starts, ends)
+    # A marker 'mark' with a verbal head indicates a subordinate clause
+    subordinate = window_sum((dep == arrays["mark"]) & (arrays["head_pos"] == VERB), starts, ends)
+    auxpass = window_sum(dep == arrays["auxpass"], starts, ends)
+    vbn = window_sum(arrays["tag"] == arrays["vbn"], starts, ends)
+    # Distances come from the full-context parse, so heads may lie outside the window
+    distance = window_sum(arrays["head_dist"], starts, ends)
+    dependents = window_sum(arrays["head_dist"] > 0, starts, ends)
+    n_sents, sent_len, marked = sentence_counts(arrays, starts, ends, policy)
+    msl = ratio(sent_len, n_sents)
+
+    return starts, {
+        "MSL": msl,
+        "SCR": ratio(subordinate, verbs),
+        "PassiveAuxRatio": ratio(auxpass, verbs),
+        "PastParticipleRatio": ratio(vbn, verbs),
+        "AWL": window_sum(arrays["word_len"], starts, ends) / window_size,
+        "NounRatio": window_sum(pos == NOUN, starts, ends) / window_size,
+        "VerbRatio": verbs / window_size,
+        "AdjRatio": window_sum(pos == ADJ, starts, ends) / window_size,
+        "AdvRatio": window_sum(pos == ADV, starts, ends) / window_size,
+        "AvgClauseLength": msl,
+        "MeanDependencyDistance": ratio(distance, dependents),
+        "SubordinationIndex": ratio(marked, n_sents)
+    }
@@ -2,6 +2,10 @@ import re
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 
+from figure_renderer import Figure, render_figures
+
+FONT_PATH = 'times.ttf'
+
 # Set the font to Times New Roman
 plt.rcParams['font.family'] = 'serif'
 plt.rcParams['font.serif'] = ['Times New Roman']
@@ -26,20 +30,26 @@ for line in content.split('\n'):
             if weight > 0.001:
                 topics[current_topic][word] = weight
 
-# Generate word clouds for each topic and save to files
+
+# Create a word cloud figure, using the bundled Times New Roman font
+def plot_word_cloud(keywords, topic):
+    wordcloud = WordCloud(width=800, height=400, background_color='white', font_path=FONT_PATH)
+    # Generate the word cloud
+    wordcloud.generate_from_frequencies(keywords)
+    # Display the word cloud
+    fig = plt.figure(figsize=(10, 5))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.title(f'Word Cloud for {topic}')
+    plt.axis('off')
+    return fig
+
+
+# Generate word clouds for each topic and save to files (in parallel, skipping unchanged topics)
+figures = []
 for topic, keywords in topics.items():
     if keywords:  # Check if there are words for the word cloud
-        # Create a word cloud object, specifying the font path for Times New Roman
-        wordcloud = WordCloud(width=800, height=400, background_color='white', font_path='C:/Windows/Fonts/times.ttf')
-        # Generate the word cloud
-        wordcloud.generate_from_frequencies(keywords)
-        # Display the word cloud
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.title(f'Word Cloud for {topic}')
-        plt.axis('off')
-        # Save the word cloud to a file
-        plt.savefig(f'word_cloud_{topic}.png', bbox_inches='tight')
-        plt.close()
+        figures.append(Figure(f'word_cloud_{topic}.png', plot_word_cloud, keywords, {'topic': topic},
+                              {'bbox_inches': 'tight'}))
     else:
         print(f'Skipping empty topic: {topic}')
+render_figures(figures)